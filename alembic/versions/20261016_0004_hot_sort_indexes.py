@@ -0,0 +1,52 @@
+"""add composite indexes for hot-sort queries
+
+Revision ID: 20261016_0004
+Revises: 20260311_0003
+Create Date: 2026-10-16 10:00:00
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "20261016_0004"
+down_revision: Union[str, None] = "20260311_0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_books_hot",
+        "books",
+        [sa.text("download_count DESC"), sa.text("favorite_count DESC"), sa.text("created_at DESC")],
+        unique=False,
+    )
+    op.create_index(
+        "ix_books_author_hot",
+        "books",
+        ["author", sa.text("download_count DESC"), sa.text("favorite_count DESC"), sa.text("created_at DESC")],
+        unique=False,
+    )
+    op.drop_index("ix_books_download_count", table_name="books")
+    op.drop_index("ix_books_author", table_name="books")
+
+    op.create_index(
+        "ix_download_logs_user_created",
+        "download_logs",
+        ["user_id", sa.text("created_at DESC")],
+        unique=False,
+    )
+    op.drop_index("ix_download_logs_user_id", table_name="download_logs")
+
+
+def downgrade() -> None:
+    op.create_index("ix_download_logs_user_id", "download_logs", ["user_id"], unique=False)
+    op.drop_index("ix_download_logs_user_created", table_name="download_logs")
+
+    op.create_index("ix_books_author", "books", ["author"], unique=False)
+    op.create_index("ix_books_download_count", "books", ["download_count"], unique=False)
+    op.drop_index("ix_books_author_hot", table_name="books")
+    op.drop_index("ix_books_hot", table_name="books")
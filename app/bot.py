@@ -7,19 +7,51 @@
 import asyncio
 import sys
 from pathlib import Path
+from typing import Any
+
+import orjson
 
 from aiogram import Bot, Dispatcher
+from aiogram.webhook.aiohttp_server import SimpleRequestHandler, setup_application
+from aiohttp import web
 from aiogram.client.default import DefaultBotProperties
+from aiogram.client.session.aiohttp import AiohttpSession
 from aiogram.enums import ParseMode
 from aiogram.fsm.strategy import FSMStrategy
-from aiogram.types import ErrorEvent
+from aiogram.types import BotCommand, BotCommandScopeDefault, ErrorEvent
 
 # 确保项目根目录在路径中
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from app.core.config import get_settings
+from app.core.database import warmup_pool
+from app.core.eventloop import install_event_loop
 from app.core.logger import logger
+from app.core.middlewares import PerChatConcurrencyMiddleware
 from app.handlers import register_handlers
+from app.services.downloads import close_download_recorder
+from app.services.search import get_search_service
+
+
+# Bot 命令菜单 (静态内容，导入时构建一次)
+BOT_COMMANDS = [
+    BotCommand(command="start", description="开始使用"),
+    BotCommand(command="s", description="搜索书籍"),
+    BotCommand(command="ss", description="搜索标签/主角"),
+    BotCommand(command="me", description="个人中心"),
+    BotCommand(command="coins", description="书币余额"),
+    BotCommand(command="fav", description="我的收藏"),
+    BotCommand(command="top", description="排行榜"),
+    BotCommand(command="my", description="邀请链接"),
+    BotCommand(command="settings", description="设置面板"),
+    BotCommand(command="help", description="使用帮助"),
+    BotCommand(command="about", description="关于我们"),
+]
+
+
+def orjson_dumps(value: Any) -> str:
+    """使用 orjson 序列化 Bot API 请求参数"""
+    return orjson.dumps(value).decode("utf-8")
 
 
 async def on_startup(bot: Bot) -> None:
@@ -32,24 +64,8 @@ async def on_startup(bot: Bot) -> None:
 
     try:
         # 设置 Bot 命令菜单
-        from aiogram.types import BotCommand, BotCommandScopeDefault
-
-        commands = [
-            BotCommand(command="start", description="开始使用"),
-            BotCommand(command="s", description="搜索书籍"),
-            BotCommand(command="ss", description="搜索标签/主角"),
-            BotCommand(command="me", description="个人中心"),
-            BotCommand(command="coins", description="书币余额"),
-            BotCommand(command="fav", description="我的收藏"),
-            BotCommand(command="top", description="排行榜"),
-            BotCommand(command="my", description="邀请链接"),
-            BotCommand(command="settings", description="设置面板"),
-            BotCommand(command="help", description="使用帮助"),
-            BotCommand(command="about", description="关于我们"),
-        ]
-
         await bot.set_my_commands(
-            commands=commands,
+            commands=BOT_COMMANDS,
             scope=BotCommandScopeDefault(),
         )
         logger.info("Bot 命令菜单设置成功")
@@ -62,6 +78,20 @@ async def on_startup(bot: Bot) -> None:
         logger.error(f"启动初始化失败: {e}", exc_info=True)
         raise
 
+    try:
+        # 预热数据库连接池
+        warmed = await asyncio.wait_for(warmup_pool(), timeout=15)
+        logger.info(f"数据库连接池预热完成: {warmed} 个连接")
+    except Exception as e:
+        logger.warning(f"数据库连接池预热失败: {e}")
+
+    try:
+        # 提前完成搜索索引配置，避免首个搜索请求承担初始化开销
+        await asyncio.wait_for(get_search_service(), timeout=30)
+        logger.info("搜索服务预热完成")
+    except Exception as e:
+        logger.warning(f"搜索服务预热失败: {e}")
+
     logger.info("=" * 50)
 
 
@@ -70,6 +100,13 @@ async def on_shutdown(bot: Bot) -> None:
     logger.info("=" * 50)
     logger.info("搜书神器 V2 关闭中...")
 
+    try:
+        # 写入队列中尚未落库的下载记录
+        await close_download_recorder()
+        logger.info("下载记录已写入")
+    except Exception as e:
+        logger.error(f"写入下载记录失败: {e}")
+
     try:
         # 关闭 Bot 会话
         await bot.session.close()
@@ -80,13 +117,59 @@ async def on_shutdown(bot: Bot) -> None:
     logger.info("=" * 50)
 
 
+async def run_webhook(bot: Bot, dp: Dispatcher) -> None:
+    """以 Webhook 模式运行 (由 Telegram 主动推送更新)"""
+    settings = get_settings()
+    if not settings.webhook_host:
+        raise RuntimeError("Webhook 模式必须配置 WEBHOOK_HOST")
+    # 未校验密钥时任何人都能伪造更新 (包括伪造管理员身份)，拒绝启动
+    if not settings.webhook_secret:
+        raise RuntimeError("Webhook 模式必须配置 WEBHOOK_SECRET")
+
+    app = web.Application()
+    SimpleRequestHandler(
+        dispatcher=dp,
+        bot=bot,
+        secret_token=settings.webhook_secret,
+    ).register(app, path=settings.webhook_path)
+    # 将 Dispatcher 的启动/关闭钩子挂到 aiohttp 应用生命周期上
+    setup_application(app, dp, bot=bot)
+
+    runner = web.AppRunner(app)
+    await runner.setup()
+    # 本地只提供明文 HTTP，Telegram 的 HTTPS 请求由反向代理终结 TLS 后转发到这里
+    site = web.TCPSite(runner, host=settings.webhook_listen_host, port=settings.webhook_listen_port)
+    try:
+        await site.start()
+        await bot.set_webhook(
+            settings.webhook_url,
+            drop_pending_updates=True,
+            secret_token=settings.webhook_secret,
+        )
+        logger.info(
+            f"Webhook 已启动: {settings.webhook_url} "
+            f"(本地监听 {settings.webhook_listen_host}:{settings.webhook_listen_port})"
+        )
+        await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()
+
+
 async def main() -> None:
     """主入口函数"""
     settings = get_settings()
 
     # 初始化 Bot
+    # Bot API 请求/响应的 JSON 编解码使用 orjson；连接池与超时集中配置
+    session = AiohttpSession(
+        limit=settings.bot_api_pool_size,
+        timeout=settings.bot_api_timeout,
+        json_loads=orjson.loads,
+        json_dumps=orjson_dumps,
+    )
     bot = Bot(
         token=settings.bot_token,
+        session=session,
         default=DefaultBotProperties(parse_mode=ParseMode.HTML),
     )
 
@@ -123,9 +206,21 @@ async def main() -> None:
 
     dp.errors.register(on_error)
 
+    # 同一会话内串行处理，不同会话并发
+    dp.update.outer_middleware(PerChatConcurrencyMiddleware())
+
     # 注册所有处理器
     register_handlers(dp)
 
+    if settings.use_webhook:
+        logger.info("Bot 初始化完成，使用 Webhook 模式...")
+        try:
+            await run_webhook(bot, dp)
+        except Exception as e:
+            logger.error(f"Webhook 运行出错: {e}", exc_info=True)
+            raise
+        return
+
     logger.info("Bot 初始化完成，开始轮询...")
 
     # 清除 Webhook 以确保 Polling 模式可用
@@ -143,6 +238,7 @@ async def main() -> None:
 
 
 if __name__ == "__main__":
+    install_event_loop()
     try:
         asyncio.run(main())
     except KeyboardInterrupt:
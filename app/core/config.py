@@ -4,6 +4,7 @@
 使用 Pydantic Settings 管理环境变量
 """
 
+from functools import cached_property
 from pathlib import Path
 from typing import List, Optional
 
@@ -14,35 +15,21 @@ from pydantic_settings import BaseSettings, SettingsConfigDict
 BASE_DIR = Path(__file__).parent.parent.parent.absolute()
 
 
-class Settings(BaseSettings):
-    """应用配置类"""
+_ENV_CONFIG = SettingsConfigDict(
+    env_file=".env",
+    env_file_encoding="utf-8",
+    extra="ignore",
+)
 
-    model_config = SettingsConfigDict(
-        env_file=".env",
-        env_file_encoding="utf-8",
-        extra="ignore",
-    )
 
-    # ============================================
-    # Bot 核心配置
-    # ============================================
-    bot_token: str = Field(..., description="Telegram Bot Token")
-    bot_username: str = Field(..., description="Bot 用户名")
-
-    # Webhook 配置 (生产环境)
-    webhook_host: Optional[str] = Field(None, description="Webhook 域名")
-    webhook_port: int = Field(8443, description="Webhook 端口")
-    webhook_path: str = Field("/webhook", description="Webhook 路径")
+class DatabaseSettings(BaseSettings):
+    """数据库配置
 
-    @property
-    def webhook_url(self) -> Optional[str]:
-        if self.webhook_host:
-            return f"{self.webhook_host}:{self.webhook_port}{self.webhook_path}"
-        return None
+    只包含连接数据库所需的字段，供 Alembic 迁移等一次性脚本单独加载，
+    无需提供 Bot Token、Meilisearch Key 等与迁移无关的必填项。
+    """
 
-    @property
-    def use_webhook(self) -> bool:
-        return self.webhook_host is not None
+    model_config = _ENV_CONFIG
 
     # ============================================
     # 数据库配置
@@ -53,13 +40,46 @@ class Settings(BaseSettings):
     db_user: str = Field("bookbot_user", description="数据库用户")
     db_password: str = Field(..., description="数据库密码")
 
-    @property
+    @cached_property
     def database_url(self) -> str:
         return (
             f"postgresql+asyncpg://{self.db_user}:{self.db_password}"
             f"@{self.db_host}:{self.db_port}/{self.db_name}"
         )
 
+
+class Settings(DatabaseSettings):
+    """应用配置类"""
+
+    # ============================================
+    # Bot 核心配置
+    # ============================================
+    bot_token: str = Field(..., description="Telegram Bot Token")
+    bot_username: str = Field(..., description="Bot 用户名")
+
+    # Bot API 客户端 (aiohttp 连接池上限与单次请求超时)
+    bot_api_pool_size: int = Field(100, description="Bot API 最大并发连接数")
+    bot_api_timeout: float = Field(30.0, description="Bot API 请求超时 (秒)")
+
+    # Webhook 配置 (生产环境，需显式开启；默认使用轮询)
+    use_webhook: bool = Field(False, description="是否以 Webhook 模式运行")
+    webhook_host: Optional[str] = Field(None, description="Webhook 域名")
+    webhook_port: int = Field(8443, description="Webhook 对外端口 (HTTPS，由反向代理监听)")
+    webhook_path: str = Field("/webhook", description="Webhook 路径")
+    # 本地 aiohttp 监听地址 (明文 HTTP)，由 TLS 反向代理转发，不能与对外端口相同
+    webhook_listen_host: str = Field("127.0.0.1", description="Webhook 本地监听地址")
+    webhook_listen_port: int = Field(8080, description="Webhook 本地监听端口")
+    # Telegram 推送时在 X-Telegram-Bot-Api-Secret-Token 头中带回，1-256 位 A-Z a-z 0-9 _ -
+    webhook_secret: Optional[str] = Field(
+        None, pattern=r"^[A-Za-z0-9_-]{1,256}$", description="Webhook 校验密钥 (Webhook 模式必填)"
+    )
+
+    @cached_property
+    def webhook_url(self) -> Optional[str]:
+        if self.webhook_host:
+            return f"{self.webhook_host}:{self.webhook_port}{self.webhook_path}"
+        return None
+
     # ============================================
     # Redis 配置
     # ============================================
@@ -68,7 +88,7 @@ class Settings(BaseSettings):
     redis_db: int = Field(0, description="Redis 数据库编号")
     redis_password: Optional[str] = Field(None, description="Redis 密码")
 
-    @property
+    @cached_property
     def redis_url(self) -> str:
         auth = f":{self.redis_password}@" if self.redis_password else ""
         return f"redis://{auth}{self.redis_host}:{self.redis_port}/{self.redis_db}"
@@ -117,15 +137,15 @@ class Settings(BaseSettings):
     # ============================================
     # 路径配置
     # ============================================
-    @property
+    @cached_property
     def log_dir(self) -> Path:
         return BASE_DIR / "logs"
 
-    @property
+    @cached_property
     def data_dir(self) -> Path:
         return BASE_DIR / "data"
 
-    @property
+    @cached_property
     def temp_dir(self) -> Path:
         return BASE_DIR / "temp"
 
@@ -141,3 +161,13 @@ def get_settings() -> Settings:
         _settings = Settings()
     return _settings
 
+
+def get_database_settings() -> DatabaseSettings:
+    """获取数据库配置
+
+    已加载完整配置时直接复用，否则只解析数据库相关字段。
+    """
+    if _settings is not None:
+        return _settings
+    return DatabaseSettings()
+
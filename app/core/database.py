@@ -4,8 +4,11 @@
 提供异步数据库会话管理
 """
 
+import asyncio
 from typing import AsyncGenerator, Optional
 
+from sqlalchemy import Row, bindparam, select, text
+
 from sqlalchemy.ext.asyncio import (
     AsyncEngine,
     AsyncSession,
@@ -13,8 +16,10 @@ from sqlalchemy.ext.asyncio import (
     create_async_engine,
 )
 from sqlalchemy.orm import declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from app.core.config import get_settings
+from app.core.models import User
 
 _engine: Optional[AsyncEngine] = None
 _session_factory: Optional[async_sessionmaker[AsyncSession]] = None
@@ -28,9 +33,16 @@ def get_engine() -> AsyncEngine:
             settings.database_url,
             echo=settings.log_level == "DEBUG",
             future=True,
+            # 显式指定异步连接池，避免误用同步 QueuePool 阻塞事件循环
+            poolclass=AsyncAdaptedQueuePool,
+            # 签出前 ping 一次，避免数据库端空闲断开后首个查询失败
             pool_pre_ping=True,
             pool_size=20,
             max_overflow=10,
+            pool_timeout=10,
+            pool_recycle=1800,
+            # 编译语句缓存，热点查询无需每次重新编译 SQL
+            query_cache_size=1200,
         )
     return _engine
 
@@ -59,6 +71,53 @@ async def get_db_session() -> AsyncGenerator[AsyncSession, None]:
             await session.close()
 
 
+# 热路径语句导入时构建一次，调用时只绑定参数
+_FETCH_USER_STMT = select(
+    User.id,
+    User.coins,
+    User.level,
+    User.is_vip,
+    User.is_banned,
+    User.is_admin,
+).where(User.id == bindparam("user_id"))
+
+
+async def fetch_user_fast(user_id: int) -> Optional[Row]:
+    """只读查询用户常用字段 (绕过 ORM 会话与对象构建，适合热路径)
+
+    Returns:
+        Optional[Row]: 包含 id/coins/level/is_vip/is_banned/is_admin 的行，用户不存在时为 None
+    """
+    async with get_engine().connect() as conn:
+        result = await conn.execute(_FETCH_USER_STMT, {"user_id": user_id})
+        return result.first()
+
+
+async def warmup_pool() -> int:
+    """预热连接池：并发建立 pool_size 个连接，避免首批请求承担握手开销
+
+    Returns:
+        int: 预热的连接数
+    """
+    engine = get_engine()
+    size = engine.pool.size()
+    barrier = asyncio.Barrier(size)
+
+    async def _hold_connection() -> None:
+        try:
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+                # 所有连接同时被持有，连接池才会真正建立 size 个连接
+                await barrier.wait()
+        except BaseException:
+            # 任一连接失败时释放其余等待者，避免连接被永久占用
+            await barrier.abort()
+            raise
+
+    await asyncio.gather(*(_hold_connection() for _ in range(size)))
+    return size
+
+
 async def init_db():
     """初始化数据库 (创建所有表)"""
     from app.core.models import Base
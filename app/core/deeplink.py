@@ -1,17 +1,22 @@
-import base64
+import binascii
+
+# 按 len % 4 直接查表得到需要补齐的 "=" 数量
+_PAD = (b"", b"===", b"==", b"=")
+# 标准 base64 与 URL 安全字母表之间的互转表
+_TO_URLSAFE = bytes.maketrans(b"+/", b"-_")
+_FROM_URLSAFE = bytes.maketrans(b"-_", b"+/")
 
 
 def encode_payload(value: str) -> str:
     raw = (value or "").encode("utf-8")
-    token = base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
-    return token
+    token = binascii.b2a_base64(raw, newline=False).translate(_TO_URLSAFE).rstrip(b"=")
+    return token.decode("ascii")
 
 
 def decode_payload(token: str) -> str:
     token = (token or "").strip()
     if not token:
         return ""
-    padding = "=" * ((4 - (len(token) % 4)) % 4)
-    raw = base64.urlsafe_b64decode((token + padding).encode("ascii"))
+    raw_b = token.encode("ascii").translate(_FROM_URLSAFE)
+    raw = binascii.a2b_base64(raw_b + _PAD[len(raw_b) & 3])
     return raw.decode("utf-8", errors="replace")
-
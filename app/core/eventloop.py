@@ -0,0 +1,20 @@
+# -*- coding: utf-8 -*-
+"""
+搜书神器 V2 - 事件循环配置
+Bot 与 Worker 进程共用
+"""
+
+import asyncio
+
+from app.core.logger import logger
+
+
+def install_event_loop() -> None:
+    """安装 uvloop 事件循环 (未安装或不支持的平台回退到默认循环)"""
+    try:
+        import uvloop
+    except ImportError:
+        logger.info("未安装 uvloop，使用默认事件循环")
+        return
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    logger.info("已启用 uvloop 事件循环")
@@ -4,13 +4,20 @@
 统一的日志配置和管理
 """
 
+import atexit
+import copy
 import logging
-import json
+import queue
 import sys
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any
-from logging.handlers import TimedRotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+import orjson
+
+# 单个日志文件的轮转阈值
+LOG_FILE_MAX_BYTES = 64 * 1024 * 1024
 
 
 class ColoredFormatter(logging.Formatter):
@@ -26,13 +33,22 @@ class ColoredFormatter(logging.Formatter):
         "RESET": "\033[0m",       # 重置
     }
 
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        # 预先生成带颜色的级别名称，避免每条日志重复拼接
+        reset = self.COLORS["RESET"]
+        self._colored = {
+            name: f"{color}{name}{reset}"
+            for name, color in self.COLORS.items()
+            if name != "RESET"
+        }
+
     def format(self, record: logging.LogRecord) -> str:
         # 保存原始级别名称
         levelname = record.levelname
 
         # 添加颜色
-        if levelname in self.COLORS:
-            record.levelname = f"{self.COLORS[levelname]}{levelname}{self.COLORS['RESET']}"
+        record.levelname = self._colored.get(levelname, levelname)
 
         # 格式化消息
         result = super().format(record)
@@ -43,11 +59,26 @@ class ColoredFormatter(logging.Formatter):
         return result
 
 
+class LocalQueueHandler(QueueHandler):
+    """进程内队列处理器
+
+    仅预先渲染消息参数，保留 exc_info 交给后台线程中的格式化器处理，
+    事件循环线程只负责入队。
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
 class Logger:
     """日志管理器"""
 
     _instance: "Logger" = None
     _logger: logging.Logger = None
+    _listener: QueueListener = None
 
     def __new__(cls) -> "Logger":
         if cls._instance is None:
@@ -75,9 +106,27 @@ class Logger:
         log_dir.mkdir(parents=True, exist_ok=True)
 
         class JsonFormatter(logging.Formatter):
+            def __init__(self) -> None:
+                super().__init__()
+                # 同一秒内的记录复用已格式化的秒级前缀，每秒只构造一次 datetime
+                self._cached_sec = -1
+                self._cached_prefix = ""
+
+            def _format_ts(self, created: float) -> str:
+                sec = int(created)
+                usec = round((created - sec) * 1_000_000)
+                if usec == 1_000_000:
+                    sec, usec = sec + 1, 0
+                if sec != self._cached_sec:
+                    self._cached_prefix = datetime.fromtimestamp(sec, timezone.utc).strftime("%Y-%m-%dT%H:%M:%S")
+                    self._cached_sec = sec
+                if usec:
+                    return f"{self._cached_prefix}.{usec:06d}+00:00"
+                return f"{self._cached_prefix}+00:00"
+
             def format(self, record: logging.LogRecord) -> str:
                 payload = {
-                    "ts": datetime.now(timezone.utc).isoformat(),
+                    "ts": self._format_ts(record.created),
                     "level": record.levelname,
                     "logger": record.name,
                     "msg": record.getMessage(),
@@ -89,7 +138,7 @@ class Logger:
                 }
                 if record.exc_info:
                     payload["exc"] = self.formatException(record.exc_info)
-                return json.dumps(payload, ensure_ascii=False)
+                return orjson.dumps(payload).decode("utf-8")
 
         if log_format.lower() == "json":
             console_formatter: logging.Formatter = JsonFormatter()
@@ -107,29 +156,42 @@ class Logger:
         console_handler.setLevel(level)
         console_handler.setFormatter(console_formatter)
 
-        file_handler = TimedRotatingFileHandler(
+        # 按大小轮转，delay=True 推迟到首次写入时再打开文件
+        file_handler = RotatingFileHandler(
             filename=str(log_dir / "bookbot.log"),
-            when="midnight",
+            maxBytes=LOG_FILE_MAX_BYTES,
             backupCount=14,
             encoding="utf-8",
-            utc=True,
+            delay=True,
         )
         file_handler.setLevel(level)
         file_handler.setFormatter(file_formatter)
 
-        error_file_handler = TimedRotatingFileHandler(
+        error_file_handler = RotatingFileHandler(
             filename=str(log_dir / "bookbot-error.log"),
-            when="midnight",
+            maxBytes=LOG_FILE_MAX_BYTES,
             backupCount=30,
             encoding="utf-8",
-            utc=True,
+            delay=True,
         )
         error_file_handler.setLevel(logging.ERROR)
         error_file_handler.setFormatter(file_formatter)
 
+        # 实际的格式化与写盘由后台监听线程完成，避免阻塞事件循环
+        log_queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._listener = QueueListener(
+            log_queue,
+            console_handler,
+            file_handler,
+            error_file_handler,
+            respect_handler_level=True,
+        )
+        self._listener.start()
+        atexit.register(self._listener.stop)
+
         logging.basicConfig(
             level=level,
-            handlers=[console_handler, file_handler, error_file_handler],
+            handlers=[LocalQueueHandler(log_queue)],
             force=True,
         )
 
@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+"""
+搜书神器 V2 - Dispatcher 中间件
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict
+
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject
+
+
+class PerChatConcurrencyMiddleware(BaseMiddleware):
+    """按会话串行处理更新
+
+    aiogram 默认把每个更新作为独立任务并发处理；本中间件保证同一会话内的
+    更新按到达顺序执行，不同会话之间仍然并发，互不阻塞。
+    """
+
+    def __init__(self) -> None:
+        self._locks: Dict[int, asyncio.Lock] = {}
+        self._waiters: Dict[int, int] = {}
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        chat = data.get("event_chat")
+        if chat is None:
+            return await handler(event, data)
+
+        chat_id = chat.id
+        lock = self._locks.setdefault(chat_id, asyncio.Lock())
+        self._waiters[chat_id] = self._waiters.get(chat_id, 0) + 1
+        try:
+            async with lock:
+                return await handler(event, data)
+        finally:
+            # 会话内没有排队的更新时释放锁对象，避免字典无限增长
+            remaining = self._waiters[chat_id] - 1
+            if remaining:
+                self._waiters[chat_id] = remaining
+            else:
+                del self._waiters[chat_id]
+                self._locks.pop(chat_id, None)
@@ -10,7 +10,7 @@ from enum import Enum as PyEnum
 
 from sqlalchemy import (
     String, Integer, BigInteger, Float, Boolean, DateTime, Text,
-    ForeignKey, Index, UniqueConstraint, Enum, ARRAY
+    ForeignKey, Index, UniqueConstraint, Enum, ARRAY, desc
 )
 from sqlalchemy.orm import (
     DeclarativeBase, Mapped, mapped_column, relationship
@@ -65,6 +65,27 @@ class BookStatus(PyEnum):
     BANNED = "banned"        # 封禁
 
 
+# 渲染消息时频繁需要枚举的字符串值，导入时预先建表，避免每次走 .value 描述符
+_USER_LEVEL_STR = {m: m.value for m in UserLevel}
+_FILE_FORMAT_STR = {m: m.value for m in FileFormat}
+_BOOK_STATUS_STR = {m: m.value for m in BookStatus}
+
+
+def user_level_str(level: UserLevel) -> str:
+    """用户等级显示文本"""
+    return _USER_LEVEL_STR[level]
+
+
+def file_format_str(file_format: FileFormat) -> str:
+    """文件格式显示文本"""
+    return _FILE_FORMAT_STR[file_format]
+
+
+def book_status_str(status: BookStatus) -> str:
+    """书籍状态字符串值"""
+    return _BOOK_STATUS_STR[status]
+
+
 # ============================================
 # 用户相关模型
 # ============================================
@@ -101,8 +122,8 @@ class User(Base):
     search_count: Mapped[int] = mapped_column(Integer, default=0, comment="搜索次数")
 
     # 关联
-    favorites: Mapped[List["Favorite"]] = relationship("Favorite", back_populates="user", lazy="selectin")
-    uploads: Mapped[List["Book"]] = relationship("Book", back_populates="uploader", foreign_keys="Book.uploader_id", lazy="selectin")
+    favorites: Mapped[List["Favorite"]] = relationship("Favorite", back_populates="user", lazy="raise_on_sql")
+    uploads: Mapped[List["Book"]] = relationship("Book", back_populates="uploader", foreign_keys="Book.uploader_id", lazy="raise_on_sql")
 
     # 索引
     __table_args__ = (
@@ -134,8 +155,8 @@ class File(Base):
     language: Mapped[Optional[str]] = mapped_column(String(10), nullable=True, comment="语言检测")
 
     # 关联
-    book_refs: Mapped[List["Book"]] = relationship("Book", back_populates="file", lazy="selectin")
-    file_refs: Mapped[List["FileRef"]] = relationship("FileRef", back_populates="file", lazy="selectin")
+    book_refs: Mapped[List["Book"]] = relationship("Book", back_populates="file", lazy="raise_on_sql")
+    file_refs: Mapped[List["FileRef"]] = relationship("FileRef", back_populates="file", lazy="raise_on_sql")
 
     # 索引
     __table_args__ = (
@@ -165,7 +186,7 @@ class FileRef(Base):
     is_active: Mapped[bool] = mapped_column(Boolean, default=True, comment="是否可用")
 
     # 关联
-    file: Mapped["File"] = relationship("File", back_populates="file_refs", lazy="selectin")
+    file: Mapped["File"] = relationship("File", back_populates="file_refs", lazy="raise_on_sql")
 
     # 索引
     __table_args__ = (
@@ -228,24 +249,26 @@ class Book(Base):
     uploader_id: Mapped[int] = mapped_column(ForeignKey("users.id"), comment="上传者ID")
 
     # 关联
-    file: Mapped["File"] = relationship("File", back_populates="book_refs", lazy="selectin")
-    uploader: Mapped["User"] = relationship("User", back_populates="uploads", foreign_keys=[uploader_id], lazy="selectin")
-    favorites: Mapped[List["Favorite"]] = relationship("Favorite", back_populates="book", lazy="selectin")
-    book_tags: Mapped[List["BookTag"]] = relationship("BookTag", back_populates="book", lazy="selectin")
-    reviews: Mapped[List["BookReview"]] = relationship("BookReview", back_populates="book", lazy="selectin")
-    booklist_items: Mapped[List["BookListItem"]] = relationship("BookListItem", back_populates="book", lazy="selectin")
+    # 默认不加载任何关联，需要时在查询中显式指定 selectinload 等加载选项
+    file: Mapped["File"] = relationship("File", back_populates="book_refs", lazy="raise_on_sql")
+    uploader: Mapped["User"] = relationship("User", back_populates="uploads", foreign_keys=[uploader_id], lazy="raise_on_sql")
+    favorites: Mapped[List["Favorite"]] = relationship("Favorite", back_populates="book", lazy="raise_on_sql")
+    book_tags: Mapped[List["BookTag"]] = relationship("BookTag", back_populates="book", lazy="raise_on_sql")
+    reviews: Mapped[List["BookReview"]] = relationship("BookReview", back_populates="book", lazy="raise_on_sql")
+    booklist_items: Mapped[List["BookListItem"]] = relationship("BookListItem", back_populates="book", lazy="raise_on_sql")
 
     # 索引
     __table_args__ = (
         Index('ix_books_title', 'title'),
-        Index('ix_books_author', 'author'),
         Index('ix_books_file_hash', 'file_hash'),
         Index('ix_books_uploader_id', 'uploader_id'),
         Index('ix_books_status', 'status'),
         Index('ix_books_is_18plus', 'is_18plus'),
         Index('ix_books_rating_score', 'rating_score'),
-        Index('ix_books_download_count', 'download_count'),
         Index('ix_books_created_at', 'created_at'),
+        # 与相似推荐的热度排序一致，ORDER BY ... LIMIT 可直接走索引而无需排序
+        Index('ix_books_hot', desc('download_count'), desc('favorite_count'), desc('created_at')),
+        Index('ix_books_author_hot', 'author', desc('download_count'), desc('favorite_count'), desc('created_at')),
     )
 
 
@@ -268,7 +291,7 @@ class Tag(Base):
     usage_count: Mapped[int] = mapped_column(Integer, default=0, comment="使用次数")
 
     # 关联
-    book_tags: Mapped[List["BookTag"]] = relationship("BookTag", back_populates="tag", lazy="selectin")
+    book_tags: Mapped[List["BookTag"]] = relationship("BookTag", back_populates="tag", lazy="raise_on_sql")
 
     # 索引
     __table_args__ = (
@@ -290,8 +313,8 @@ class BookTag(Base):
     added_by: Mapped[Optional[int]] = mapped_column(BigInteger, nullable=True, comment="添加者ID")
 
     # 关联
-    book: Mapped["Book"] = relationship("Book", back_populates="book_tags", lazy="selectin")
-    tag: Mapped["Tag"] = relationship("Tag", back_populates="book_tags", lazy="selectin")
+    book: Mapped["Book"] = relationship("Book", back_populates="book_tags", lazy="raise_on_sql")
+    tag: Mapped["Tag"] = relationship("Tag", back_populates="book_tags", lazy="raise_on_sql")
 
     # 索引和唯一约束
     __table_args__ = (
@@ -318,8 +341,8 @@ class Favorite(Base):
     collection_name: Mapped[Optional[str]] = mapped_column(String(50), nullable=True, comment="收藏列表名")
 
     # 关联
-    user: Mapped["User"] = relationship("User", back_populates="favorites", lazy="selectin")
-    book: Mapped["Book"] = relationship("Book", back_populates="favorites", lazy="selectin")
+    user: Mapped["User"] = relationship("User", back_populates="favorites", lazy="raise_on_sql")
+    book: Mapped["Book"] = relationship("Book", back_populates="favorites", lazy="raise_on_sql")
 
     # 索引和唯一约束
     __table_args__ = (
@@ -403,7 +426,7 @@ class BookList(Base):
     is_public: Mapped[bool] = mapped_column(Boolean, default=False, comment="是否公开分享")
     share_token: Mapped[Optional[str]] = mapped_column(String(40), nullable=True, unique=True, comment="分享令牌")
 
-    items: Mapped[List["BookListItem"]] = relationship("BookListItem", back_populates="booklist", lazy="selectin")
+    items: Mapped[List["BookListItem"]] = relationship("BookListItem", back_populates="booklist", lazy="raise_on_sql")
 
     __table_args__ = (
         UniqueConstraint("user_id", "name", name="uq_booklists_user_name"),
@@ -421,8 +444,8 @@ class BookListItem(Base):
     book_id: Mapped[int] = mapped_column(ForeignKey("books.id"), nullable=False, comment="书籍ID")
     added_by: Mapped[Optional[int]] = mapped_column(BigInteger, nullable=True, comment="添加人ID")
 
-    booklist: Mapped["BookList"] = relationship("BookList", back_populates="items", lazy="selectin")
-    book: Mapped["Book"] = relationship("Book", back_populates="booklist_items", lazy="selectin")
+    booklist: Mapped["BookList"] = relationship("BookList", back_populates="items", lazy="raise_on_sql")
+    book: Mapped["Book"] = relationship("Book", back_populates="booklist_items", lazy="raise_on_sql")
 
     __table_args__ = (
         UniqueConstraint("list_id", "book_id", name="uq_booklist_items_unique"),
@@ -441,7 +464,7 @@ class BookReview(Base):
     rating: Mapped[int] = mapped_column(Integer, nullable=False, default=5, comment="评分(1-5)")
     comment: Mapped[Optional[str]] = mapped_column(String(240), nullable=True, comment="短评")
 
-    book: Mapped["Book"] = relationship("Book", back_populates="reviews", lazy="selectin")
+    book: Mapped["Book"] = relationship("Book", back_populates="reviews", lazy="raise_on_sql")
 
     __table_args__ = (
         UniqueConstraint("user_id", "book_id", name="uq_book_reviews_user_book"),
@@ -529,7 +552,7 @@ class DownloadLog(Base):
 
     # 索引
     __table_args__ = (
-        Index('ix_download_logs_user_id', 'user_id'),
+        Index('ix_download_logs_user_created', 'user_id', desc('created_at')),
         Index('ix_download_logs_book_id', 'book_id'),
         Index('ix_download_logs_created_at', 'created_at'),
     )
@@ -9,3 +9,35 @@ def escape_html(value: Optional[str]) -> str:
         return ""
     return html.escape(value, quote=True)
 
+
+
+# 文件大小单位与对应除数，按 bit_length 直接定位单位，无需逐级比较
+_SIZE_UNITS = ("B", "KB", "MB", "GB")
+_SIZE_DIVS = (1, 1024, 1024 ** 2, 1024 ** 3)
+
+
+def format_size(size_bytes: int) -> str:
+    size_bytes = int(size_bytes)
+    if size_bytes < 1024:
+        return f"{size_bytes}B"
+    idx = min((size_bytes.bit_length() - 1) // 10, 3)
+    div = _SIZE_DIVS[idx]
+    # 全程整数运算：以 0.1 为单位四舍六入五成双，与 round(value, 1) 结果一致
+    tenths, rem = divmod(size_bytes * 10, div)
+    if rem * 2 > div or (rem * 2 == div and tenths & 1):
+        tenths += 1
+    whole, frac = divmod(tenths, 10)
+    if frac or idx == 3:
+        return f"{whole}.{frac}{_SIZE_UNITS[idx]}"
+    return f"{whole}{_SIZE_UNITS[idx]}"
+
+
+def format_word_count(count: int) -> str:
+    if count < 10000:
+        return f"{count}"
+    if count < 100000000:
+        # 万字截断到一位小数
+        whole, frac = divmod(count // 1000, 10)
+        return f"{whole}.{frac}万"
+    # 亿级极少出现，保留浮点格式化，进位规则与原实现逐位一致
+    return f"{count / 100000000:.1f}亿"
@@ -9,17 +9,19 @@ from __future__ import annotations
 import asyncio
 from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import Any, Optional
+from functools import lru_cache, partial
+from typing import Any, Awaitable, Callable, Optional
 
 from aiogram import Bot, F, Router
-from aiogram.exceptions import TelegramBadRequest
+from cachetools import TTLCache
+from aiogram.exceptions import TelegramAPIError, TelegramBadRequest, TelegramNotFound
 from aiogram.types import CallbackQuery, InlineKeyboardButton, InlineKeyboardMarkup, Message
-from sqlalchemy import select, update
+from sqlalchemy import Row, bindparam, delete, select, update
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import joinedload, selectinload
 
 from app.core.config import get_settings
-from app.core.database import get_session_factory
+from app.core.database import fetch_user_fast, get_engine, get_session_factory
 from app.core.deeplink import encode_payload
 from app.core.logger import logger
 from app.core.models import (
@@ -27,14 +29,14 @@ from app.core.models import (
     BookList,
     BookReview,
     BookTag,
-    DownloadLog,
     Favorite,
     File,
     FileRef,
     TagApplication,
     User,
+    file_format_str,
 )
-from app.core.text import escape_html
+from app.core.text import escape_html, format_size, format_word_count
 from app.services.book_ops import (
     SimilarBooksResult,
     add_book_to_booklist,
@@ -43,6 +45,7 @@ from app.services.book_ops import (
     edit_book_field,
     ensure_user_record,
     get_book_edit_history,
+    get_booklist_selection,
     get_public_booklist,
     get_recent_reviews,
     get_similar_books,
@@ -54,8 +57,10 @@ from app.services.book_ops import (
     submit_tag_application,
     sync_book_to_search,
     toggle_booklist_public,
+    touch_user_status,
     upsert_review,
 )
+from app.services.downloads import DownloadEvent, get_download_recorder
 
 book_detail_router = Router(name="book_detail")
 
@@ -64,19 +69,18 @@ book_detail_router = Router(name="book_detail")
 class PendingAction:
     action: str
     payload: dict[str, Any]
-    expires_at: datetime
 
 
-PENDING_ACTIONS: dict[int, PendingAction] = {}
 PENDING_TTL = timedelta(minutes=10)
+# 等待用户输入的操作，超时自动淘汰；容量有上限，未回复的用户不会让字典无限增长
+PENDING_ACTIONS: TTLCache[int, PendingAction] = TTLCache(
+    maxsize=10_000,
+    ttl=PENDING_TTL.total_seconds(),
+)
 
 
 def set_pending_action(user_id: int, action: str, **payload: Any) -> None:
-    PENDING_ACTIONS[user_id] = PendingAction(
-        action=action,
-        payload=payload,
-        expires_at=datetime.now() + PENDING_TTL,
-    )
+    PENDING_ACTIONS[user_id] = PendingAction(action=action, payload=payload)
 
 
 def clear_pending_action(user_id: int) -> None:
@@ -84,66 +88,55 @@ def clear_pending_action(user_id: int) -> None:
 
 
 def peek_pending_action(user_id: int) -> Optional[PendingAction]:
-    row = PENDING_ACTIONS.get(user_id)
-    if not row:
-        return None
-    if row.expires_at < datetime.now():
-        PENDING_ACTIONS.pop(user_id, None)
-        return None
-    return row
-
-
-def format_size(size_bytes: int) -> str:
-    if size_bytes < 1024:
-        return f"{size_bytes}B"
-    if size_bytes < 1024 * 1024:
-        kb = round(size_bytes / 1024, 1)
-        return f"{int(kb)}KB" if float(kb).is_integer() else f"{kb:.1f}KB"
-    if size_bytes < 1024 * 1024 * 1024:
-        mb = round(size_bytes / (1024 * 1024), 1)
-        return f"{int(mb)}MB" if float(mb).is_integer() else f"{mb:.1f}MB"
-    return f"{size_bytes / (1024 * 1024 * 1024):.1f}GB"
+    return PENDING_ACTIONS.get(user_id)
 
 
 def format_date(dt: Optional[datetime]) -> str:
-    if not dt:
-        return "未知"
-    try:
-        return dt.strftime("%Y/%m/%d %H:%M:%S")
-    except Exception:
-        return "未知"
+    return dt.strftime("%Y/%m/%d %H:%M:%S") if dt else "未知"
 
 
-def format_word_count(count: int) -> str:
-    if count < 10000:
-        return f"{count}"
-    if count < 100000000:
-        value = count / 10000
-        value = int(value * 10) / 10
-        return f"{value:.1f}万"
-    return f"{count / 100000000:.1f}亿"
+# Telegram 已拒绝过的 file_id (机器人重建、文件过期等)，命中后直接走备份频道复制，省去一次必然失败的请求
+BAD_FILE_IDS: TTLCache[str, bool] = TTLCache(maxsize=10_000, ttl=timedelta(hours=6).total_seconds())
 
-
-def pick_primary_file_ref(file_refs: list[FileRef]) -> Optional[FileRef]:
-    for ref in file_refs:
-        if ref.is_active and ref.is_primary and ref.tg_file_id:
-            return ref
-    for ref in file_refs:
-        if ref.is_active and ref.tg_file_id:
-            return ref
-    return None
+# 只有这些错误说明 file_id 本身不可用；会话不存在、被拉黑、标题解析失败等与文件无关
+_FILE_ID_ERROR_MARKERS = (
+    "wrong file identifier",
+    "wrong remote file identifier",
+    "file reference",
+    "file_reference",
+    "file_id",
+    "file identifier",
+)
 
 
-def pick_backup_ref(file_refs: list[FileRef]) -> Optional[FileRef]:
-    for ref in file_refs:
-        if ref.is_active and ref.is_backup and ref.channel_id and ref.message_id:
-            return ref
-    for ref in file_refs:
-        if ref.is_active and ref.channel_id and ref.message_id:
-            return ref
-    return None
+def is_file_id_error(error: TelegramAPIError) -> bool:
+    """判断 Telegram 错误是否由 file_id 失效引起"""
+    message = (error.message or "").lower()
+    return any(marker in message for marker in _FILE_ID_ERROR_MARKERS)
 
 
+def pick_file_refs(file_refs: list[FileRef]) -> tuple[Optional[FileRef], Optional[FileRef]]:
+    """单次遍历选出 (主发送引用, 备份引用)，优先标记为主/备份的有效引用"""
+    primary = primary_fallback = None
+    backup = backup_fallback = None
+    for ref in file_refs:
+        if not ref.is_active:
+            continue
+        if ref.tg_file_id and primary is None:
+            if ref.is_primary:
+                primary = ref
+            elif primary_fallback is None:
+                primary_fallback = ref
+        if ref.channel_id and ref.message_id and backup is None:
+            if ref.is_backup:
+                backup = ref
+            elif backup_fallback is None:
+                backup_fallback = ref
+    return primary or primary_fallback, backup or backup_fallback
+
+
+# 键盘只依赖参数，按参数缓存复用；返回的键盘为共享对象，调用方不得修改
+@lru_cache(maxsize=4096)
 def build_user_book_keyboard(*, book_id: int, is_fav: bool, is_admin: bool = False) -> InlineKeyboardMarkup:
     fav_text = "已收藏" if is_fav else "收藏"
     rows: list[list[InlineKeyboardButton]] = [
@@ -170,6 +163,7 @@ def build_user_book_keyboard(*, book_id: int, is_fav: bool, is_admin: bool = Fal
     return InlineKeyboardMarkup(inline_keyboard=rows)
 
 
+@lru_cache(maxsize=4096)
 def build_more_keyboard(*, book_id: int, is_admin: bool = False) -> InlineKeyboardMarkup:
     rows = [
         [
@@ -198,10 +192,11 @@ def build_booklist_keyboard(
     book_id: int,
     booklists: list[BookList],
     selected_ids: set[int],
+    item_counts: Optional[dict[int, int]] = None,
 ) -> InlineKeyboardMarkup:
     rows: list[list[InlineKeyboardButton]] = []
     for row in booklists:
-        count = len(row.items or [])
+        count = item_counts[row.id] if item_counts is not None else len(row.items or [])
         prefix = "✅ " if row.id in selected_ids else ""
         suffix = " (默认)" if row.is_default else ""
         rows.append(
@@ -345,155 +340,304 @@ async def get_book_from_db(book_id: int) -> Optional[Book]:
             select(Book)
             .where(Book.id == book_id)
             .options(
-                selectinload(Book.file).selectinload(File.file_refs),
-                selectinload(Book.uploader),
-                selectinload(Book.book_tags).selectinload(BookTag.tag),
+                # 多对一且外键非空，用 INNER JOIN 随主查询一次取回
+                joinedload(Book.file, innerjoin=True).selectinload(File.file_refs),
+                joinedload(Book.uploader, innerjoin=True),
+                # 标签在 IN 查询中随关联行一并 JOIN 取回，省去单独一轮查询
+                selectinload(Book.book_tags).joinedload(BookTag.tag, innerjoin=True),
             )
         )
         result = await session.execute(stmt)
         return result.scalar_one_or_none()
 
 
+# 语言代码 -> 显示名称
+_LANGUAGE_NAMES = {
+    **dict.fromkeys(("zh", "zh-cn", "zh-hans", "zh-hans-cn"), "简体中文"),
+    **dict.fromkeys(("zh-tw", "zh-hk", "zh-hant", "zh-hant-tw", "zh-hant-hk"), "繁体中文"),
+    **dict.fromkeys(("en", "en-us", "en-gb"), "英文"),
+}
+
+# 详情卡片模板，导入时拼好，渲染时只做一次 format_map
+_BOOK_CAPTION_TEMPLATE = (
+    "书名: {title}\n"
+    "作者: {author}\n"
+    "文库: {language} | {fmt} | {size} | {words}字 | {rating_count}R | {comment_count}评\n"
+    "\n"
+    "统计: {view_count}热度 | {download_count}下载 | {like_count}点赞 | {favorite_count}收藏\n"
+    "评分: {rating_score:.2f}分 ({rating_people}人)\n"
+    "质量: {quality_score:.2f}分 ({rating_people}人)\n"
+    "\n"
+    "标签: {tags}\n"
+    "\n"
+    "<blockquote>{description}</blockquote>\n"
+    "\n"
+    "创建: {created}\n"
+    "更新: {updated}\n"
+    "上传: {uploader}"
+)
+
+
+_CAPTION_LIMIT = 980
+
+
+def truncate_escaped(text: str, limit: int) -> str:
+    """截断已转义的文本并追加省略号，不会切断 &amp; 等实体"""
+    if len(text) <= limit:
+        return text
+    if limit <= 3:
+        return ""
+    cut = text[: limit - 3]
+    amp = cut.rfind("&")
+    if amp != -1 and ";" not in cut[amp:]:
+        cut = cut[:amp]
+    return cut + "..."
+
+
+def format_language(value: str) -> str:
+    key = value.strip().lower().replace("_", "-")
+    name = _LANGUAGE_NAMES.get(key)
+    if name:
+        return name
+    return escape_html(value) if value else "未知"
+
+
 def build_book_caption(book: Book, *, bot_username: str = "") -> str:
-    tags = [bt.tag.name for bt in (book.book_tags or []) if bt.tag and bt.tag.name]
-    tags_display = " ".join([f"#{escape_html(t)}" for t in tags[:30]]) if tags else "暂无标签"
+    tags = [bt.tag.name for bt in (book.book_tags or []) if bt.tag and bt.tag.name][:30]
+    # "#" 与空格不受转义影响，拼接后整体转义一次即可
+    tags_display = escape_html("#" + " #".join(tags)) if tags else "暂无标签"
 
     description = (book.description or "暂无简介").strip()
     if len(description) > 350:
         description = description[:350] + "..."
 
+    uploader = book.uploader
     uploader_name = "未知"
-    if book.uploader:
+    if uploader:
         uploader_name = (
-            book.uploader.username
-            or f"{book.uploader.first_name}{book.uploader.last_name or ''}".strip()
+            uploader.username
+            or f"{uploader.first_name}{uploader.last_name or ''}".strip()
             or "未知"
         )
-    uploader_name = escape_html(uploader_name)
-
-    file_format = book.file.format.value if book.file and book.file.format else "未知"
-    file_size = format_size(book.file.size) if book.file else "未知"
-    word_count = book.file.word_count if book.file else 0
-    language = book.language or (book.file.language if book.file else None) or ""
-
-    def format_language(v: str) -> str:
-        key = v.strip().lower().replace("_", "-")
-        if key in {"zh", "zh-cn", "zh-hans", "zh-hans-cn"}:
-            return "简体中文"
-        if key in {"zh-tw", "zh-hk", "zh-hant", "zh-hant-tw", "zh-hant-hk"}:
-            return "繁体中文"
-        if key in {"en", "en-us", "en-gb"}:
-            return "英文"
-        return escape_html(v) if v else "未知"
-
-    fmt_display = file_format.upper() if file_format != "未知" else "未知"
+
+    file = book.file
+    if file:
+        fmt_display = file_format_str(file.format).upper() if file.format else "未知"
+        file_size = format_size(file.size)
+        word_count = file.word_count
+        language = book.language or file.language or ""
+    else:
+        fmt_display = file_size = "未知"
+        word_count = 0
+        language = book.language or ""
+
+    author = book.author
     safe_title = escape_html(book.title)
-    safe_author = escape_html(book.author or "Unknown")
-    safe_description = escape_html(description)
-    language_display = format_language(language)
-    bot_username = (bot_username or "").lstrip("@")
+    safe_author = escape_html(author or "Unknown")
     title_display = safe_title
     author_display = safe_author
+    bot_username = (bot_username or "").lstrip("@")
     if bot_username:
         title_link = f"https://t.me/{bot_username}?start=book_{book.id}"
         title_display = f"<a href=\"{escape_html(title_link)}\">{safe_title}</a>"
-        author_token = encode_payload(book.author or "")
+        author_token = encode_payload(author or "")
         if author_token:
             author_link = f"https://t.me/{bot_username}?start=au_{author_token}"
             author_display = f"<a href=\"{escape_html(author_link)}\">{safe_author}</a>"
 
-    lines = [
-        f"书名: {title_display}",
-        f"作者: {author_display}",
-        f"文库: {language_display} | {fmt_display} | {file_size} | {format_word_count(word_count)}字 | {book.rating_count}R | {book.comment_count}评",
-        "",
-        f"统计: {book.view_count}热度 | {book.download_count}下载 | {book.like_count}点赞 | {book.favorite_count}收藏",
-        f"评分: {float(book.rating_score or 0.0):.2f}分 ({int(book.rating_count or 0)}人)",
-        f"质量: {float(book.quality_score or 0.0):.2f}分 ({int(book.rating_count or 0)}人)",
-        "",
-        f"标签: {tags_display}",
-        "",
-        f"<blockquote>{safe_description}</blockquote>",
-        "",
-        f"创建: {format_date(book.created_at)}",
-        f"更新: {format_date(book.updated_at)}",
-        f"上传: {uploader_name}",
-    ]
-    caption = "\n".join(lines)
-    if len(caption) <= 980:
+    rating_count = book.rating_count
+    safe_description = escape_html(description)
+    fields = {
+        "title": title_display,
+        "author": author_display,
+        "language": format_language(language),
+        "fmt": fmt_display,
+        "size": file_size,
+        "words": format_word_count(word_count),
+        "rating_count": rating_count,
+        "comment_count": book.comment_count,
+        "view_count": book.view_count,
+        "download_count": book.download_count,
+        "like_count": book.like_count,
+        "favorite_count": book.favorite_count,
+        "rating_score": float(book.rating_score or 0.0),
+        "quality_score": float(book.quality_score or 0.0),
+        "rating_people": int(rating_count or 0),
+        "tags": tags_display,
+        "description": safe_description,
+        "created": format_date(book.created_at),
+        "updated": format_date(book.updated_at),
+        "uploader": escape_html(uploader_name),
+    }
+    caption = _BOOK_CAPTION_TEMPLATE.format_map(fields)
+    overflow = len(caption) - _CAPTION_LIMIT
+    if overflow <= 0:
         return caption
-    return caption[:980]
+    # 超长时只收缩简介，避免截断到链接或实体中间导致 HTML 解析失败
+    fields["description"] = truncate_escaped(safe_description, len(safe_description) - overflow)
+    return _BOOK_CAPTION_TEMPLATE.format_map(fields)
+
+
+@dataclass(frozen=True)
+class BookCard:
+    """详情卡片快照 (与会话无关，可跨请求缓存)"""
+
+    caption: str
+    file_hash: str
+    is_vip_only: bool
+    primary_file_id: Optional[str]
+    backup_channel_id: Optional[int]
+    backup_message_id: Optional[int]
+
+
+# 热门书籍的详情卡片短时缓存；计数类字段允许在 TTL 内略有滞后
+BOOK_CARD_CACHE: TTLCache[int, BookCard] = TTLCache(maxsize=2048, ttl=60)
+
+
+# 正在加载中的详情卡片：同一本书的并发未命中只查询一次库
+_CARD_INFLIGHT: dict[int, asyncio.Task[Optional[BookCard]]] = {}
+
+
+def invalidate_book_card(book_id: int) -> None:
+    BOOK_CARD_CACHE.pop(book_id, None)
+    # 失效前已发出的加载可能读到旧数据，让后续请求重新加载
+    _CARD_INFLIGHT.pop(book_id, None)
+
+
+def _forget_card_task(book_id: int, task: asyncio.Task) -> None:
+    if _CARD_INFLIGHT.get(book_id) is task:
+        del _CARD_INFLIGHT[book_id]
+
+
+async def get_book_card(book_id: int) -> Optional[BookCard]:
+    """获取详情卡片，书籍或文件不存在时返回 None"""
+    card = BOOK_CARD_CACHE.get(book_id)
+    if card is not None:
+        return card
+
+    task = _CARD_INFLIGHT.get(book_id)
+    if task is None:
+        task = asyncio.create_task(_load_book_card(book_id))
+        _CARD_INFLIGHT[book_id] = task
+        task.add_done_callback(partial(_forget_card_task, book_id))
+    # 单个调用方超时/取消不影响其他等待同一任务的请求
+    return await asyncio.shield(task)
+
+
+async def _load_book_card(book_id: int) -> Optional[BookCard]:
+    book = await get_book_from_db(book_id)
+    file = book.file if book else None
+    if not file:
+        return None
+
+    primary_ref, backup_ref = pick_file_refs(file.file_refs)
+    card = BookCard(
+        caption=build_book_caption(book, bot_username=get_settings().bot_username),
+        file_hash=book.file_hash,
+        is_vip_only=bool(book.is_vip_only),
+        primary_file_id=primary_ref.tg_file_id if primary_ref else None,
+        backup_channel_id=backup_ref.channel_id if backup_ref else None,
+        backup_message_id=backup_ref.message_id if backup_ref else None,
+    )
+    # 加载期间书籍已被修改则不写缓存
+    if _CARD_INFLIGHT.get(book_id) is asyncio.current_task():
+        BOOK_CARD_CACHE[book_id] = card
+    return card
+
+
+_USER_BOOK_FLAGS_STMT = select(
+    User.is_banned,
+    User.is_vip,
+    User.is_admin,
+    select(Favorite.id)
+    .where(Favorite.user_id == bindparam("user_id"), Favorite.book_id == bindparam("book_id"))
+    .exists()
+    .label("is_fav"),
+).where(User.id == bindparam("user_id"))
+
+
+async def fetch_user_book_flags(user_id: int, book_id: int) -> Optional[Row]:
+    """单条语句读取用户状态与收藏标记
+
+    Returns:
+        Optional[Row]: 包含 is_banned/is_vip/is_admin/is_fav 的行，用户不存在时为 None
+    """
+    async with get_engine().connect() as conn:
+        result = await conn.execute(_USER_BOOK_FLAGS_STMT, {"user_id": user_id, "book_id": book_id})
+        return result.first()
 
 
 async def get_user_context(user_id: int, book_id: int) -> tuple[bool, bool]:
-    session_factory = get_session_factory()
-    async with session_factory() as session:
-        user = await session.scalar(select(User).where(User.id == user_id))
-        is_admin = bool(user and user.is_admin)
-        fav = await session.scalar(select(Favorite).where(Favorite.user_id == user_id, Favorite.book_id == book_id))
-        return is_admin, fav is not None
+    flags = await fetch_user_book_flags(user_id, book_id)
+    if flags is None:
+        return False, False
+    return bool(flags.is_admin), bool(flags.is_fav)
 
 
 async def send_book_card(*, bot: Bot, chat_id: int, book_id: int, from_user=None) -> None:
+    user_id = from_user.id if from_user is not None else None
+
+    async def load_flags() -> Optional[Row]:
+        if user_id is None:
+            return None
+        return await fetch_user_book_flags(user_id, book_id)
+
     try:
-        book = await asyncio.wait_for(get_book_from_db(book_id), timeout=5)
+        # 书籍卡片与用户状态互不依赖，并发读取
+        card, flags = await asyncio.wait_for(asyncio.gather(get_book_card(book_id), load_flags()), timeout=5)
     except Exception as e:
         logger.warning(f"获取书籍失败: {e}")
         await bot.send_message(chat_id, "当前服务繁忙，请稍后重试")
         return
 
-    if not book or not book.file:
+    if card is None:
         await bot.send_message(chat_id, "书籍或文件信息不存在")
         return
 
-    file_refs = list(book.file.file_refs) if book.file else []
-    primary_ref = pick_primary_file_ref(file_refs)
-    backup_ref = pick_backup_ref(file_refs)
-    if not primary_ref and not backup_ref:
+    has_backup = bool(card.backup_channel_id and card.backup_message_id)
+    if not card.primary_file_id and not has_backup:
         await bot.send_message(chat_id, "文件暂不可用")
         return
 
-    caption = build_book_caption(book, bot_username=get_settings().bot_username)
+    caption = card.caption
 
-    is_admin = False
-    is_fav = False
-    if from_user is not None:
-        session_factory = get_session_factory()
-        async with session_factory() as session:
-            user = await session.scalar(select(User).where(User.id == from_user.id))
-            if user and user.is_banned:
-                await bot.send_message(chat_id, "账号已被限制使用")
-                return
-            if book.is_vip_only and not (user and user.is_vip):
-                await bot.send_message(chat_id, "本书仅会员可获取")
-                return
-            is_admin = bool(user and user.is_admin)
-            fav = await session.scalar(
-                select(Favorite).where(Favorite.user_id == from_user.id, Favorite.book_id == book_id)
-            )
-            is_fav = fav is not None
+    if flags is not None and flags.is_banned:
+        await bot.send_message(chat_id, "账号已被限制使用")
+        return
+    if user_id is not None and card.is_vip_only and not (flags and flags.is_vip):
+        await bot.send_message(chat_id, "本书仅会员可获取")
+        return
+    is_admin = bool(flags and flags.is_admin)
+    is_fav = bool(flags and flags.is_fav)
 
     keyboard = build_user_book_keyboard(book_id=book_id, is_fav=is_fav, is_admin=is_admin)
 
     sent = False
-    if primary_ref and primary_ref.tg_file_id:
+    tg_file_id = card.primary_file_id
+    if tg_file_id and tg_file_id not in BAD_FILE_IDS:
         try:
             await bot.send_document(
                 chat_id=chat_id,
-                document=primary_ref.tg_file_id,
+                document=tg_file_id,
                 caption=caption,
                 reply_markup=keyboard,
             )
             sent = True
-        except Exception as e:
+        except (TelegramBadRequest, TelegramNotFound) as e:
+            if is_file_id_error(e):
+                BAD_FILE_IDS[tg_file_id] = True
+                logger.warning(f"file_id 已失效，改用备份发送: {e}")
+            else:
+                logger.warning(f"发送文件失败: {e}")
+        except TelegramAPIError as e:
             logger.warning(f"发送文件失败: {e}")
 
-    if not sent and backup_ref and backup_ref.channel_id and backup_ref.message_id:
+    if not sent and has_backup:
         try:
             await bot.copy_message(
                 chat_id=chat_id,
-                from_chat_id=backup_ref.channel_id,
-                message_id=backup_ref.message_id,
+                from_chat_id=card.backup_channel_id,
+                message_id=card.backup_message_id,
                 caption=caption,
                 reply_markup=keyboard,
             )
@@ -501,14 +645,17 @@ async def send_book_card(*, bot: Bot, chat_id: int, book_id: int, from_user=None
         except Exception as e:
             logger.error(f"备份复制失败: {e}")
 
-    if sent and from_user is not None:
-        await record_download(
-            user_id=from_user.id,
-            username=from_user.username,
-            first_name=from_user.first_name,
-            last_name=from_user.last_name,
-            book_id=book_id,
-            file_hash=book.file_hash,
+    if sent and user_id is not None:
+        # 文件已送达，下载记录入队后由后台批量写库，不阻塞当前回调
+        get_download_recorder().record(
+            DownloadEvent(
+                user_id=user_id,
+                username=from_user.username,
+                first_name=from_user.first_name,
+                last_name=from_user.last_name,
+                book_id=book_id,
+                file_hash=card.file_hash,
+            )
         )
 
 
@@ -591,6 +738,7 @@ async def on_pending_text(message: Message):
                     comment=comment,
                 )
                 await session.commit()
+                invalidate_book_card(book_id)
                 await sync_book_to_search(session, book_id=book_id)
                 await message.answer("评价已保存")
                 return
@@ -617,7 +765,7 @@ async def on_pending_text(message: Message):
             if pending.action == "admin_edit":
                 book_id = int(pending.payload["book_id"])
                 field_name = str(pending.payload["field_name"])
-                user = await session.scalar(select(User).where(User.id == message.from_user.id))
+                user = await session.get(User, message.from_user.id)
                 if not user or not user.is_admin:
                     await message.answer("仅管理员可执行该操作")
                     return
@@ -629,6 +777,7 @@ async def on_pending_text(message: Message):
                     raw_value=text,
                 )
                 await session.commit()
+                invalidate_book_card(book_id)
                 await sync_book_to_search(session, book_id=book_id)
                 await message.answer("书籍信息已更新")
                 return
@@ -647,61 +796,34 @@ async def on_pending_text(message: Message):
             return
 
 
+# 无书籍参数的入口按钮，直接弹出提示
+_BOOK_ALERTS = {
+    "channel": "@BookFather",
+    "group": "群组入口暂未配置",
+    "feedback": "请私聊反馈给管理员",
+}
+
+
 @book_detail_router.callback_query(F.data.startswith("book:"))
 async def on_book_callback(callback: CallbackQuery):
-    data = callback.data or ""
-    action = data.replace("book:", "", 1)
+    # 回调格式: book:<action>[:<book_id>[:<arg>...]]
+    _, _, payload = (callback.data or "").partition(":")
+    action, _, raw_args = payload.partition(":")
+
+    alert = _BOOK_ALERTS.get(action)
+    if alert is not None:
+        await callback.answer(alert, show_alert=True)
+        return
+
+    handler = _BOOK_ACTIONS.get(action)
+    if handler is None or not raw_args:
+        await callback.answer("未知操作", show_alert=True)
+        return
 
     try:
-        if action.startswith("detail:"):
-            await show_book_detail(callback, int(action.split(":")[1]))
-        elif action.startswith("download:"):
-            await handle_download(callback, int(action.split(":")[1]))
-        elif action.startswith("restore:"):
-            await restore_keyboard(callback, int(action.split(":")[1]))
-        elif action.startswith("fav:"):
-            await handle_favorite(callback, int(action.split(":")[1]))
-        elif action.startswith("booklist:"):
-            await handle_booklist_callback(callback, action)
-        elif action.startswith("review:"):
-            await handle_review_callback(callback, action)
-        elif action.startswith("similar:"):
-            _, _, book_id, page = action.split(":")
-            await show_similar_books(callback, int(book_id), int(page))
-        elif action.startswith("tagadd:"):
-            await prompt_tag_application(callback, int(action.split(":")[1]))
-        elif action.startswith("more:"):
-            await show_more_menu(callback, int(action.split(":")[1]))
-        elif action.startswith("share:"):
-            await handle_share_book(callback, int(action.split(":")[1]))
-        elif action.startswith("admin_edit:"):
-            await show_admin_edit_menu(callback, int(action.split(":")[1]))
-        elif action.startswith("admin_edit_field:"):
-            _, _, book_id, field_name = action.split(":")
-            await prompt_admin_edit(callback, int(book_id), field_name)
-        elif action.startswith("admin_history:"):
-            await show_admin_history(callback, int(action.split(":")[1]))
-        elif action.startswith("admin_tag_queue:"):
-            await show_admin_tag_queue(callback, int(action.split(":")[1]))
-        elif action.startswith("admin_tag_approve:"):
-            _, _, book_id, application_id = action.split(":")
-            await handle_admin_tag_review(callback, int(book_id), int(application_id), True)
-        elif action.startswith("admin_tag_reject:"):
-            _, _, book_id, application_id = action.split(":")
-            await handle_admin_tag_review(callback, int(book_id), int(application_id), False)
-        elif action.startswith("admin_tag_remove:"):
-            _, _, book_id, tag_id = action.split(":")
-            await handle_admin_tag_remove(callback, int(book_id), int(tag_id))
-        elif action.startswith("report:"):
-            await handle_report(callback, int(action.split(":")[1]))
-        elif action == "channel":
-            await callback.answer("@BookFather", show_alert=True)
-        elif action == "group":
-            await callback.answer("群组入口暂未配置", show_alert=True)
-        elif action == "feedback":
-            await callback.answer("请私聊反馈给管理员", show_alert=True)
-        else:
-            await callback.answer("未知操作", show_alert=True)
+        book_id, *rest = raw_args.split(":")
+        args = [int(arg) if arg.isdigit() else arg for arg in rest]
+        await handler(callback, int(book_id), *args)
     except Exception as e:
         logger.error(f"处理书籍回调失败: {e}", exc_info=True)
         await callback.answer("操作失败，请重试", show_alert=True)
@@ -741,108 +863,81 @@ async def handle_download(callback: CallbackQuery, book_id: int):
 async def handle_favorite(callback: CallbackQuery, book_id: int):
     session_factory = get_session_factory()
     async with session_factory() as session:
-        user = await ensure_user_record(
+        from_user = callback.from_user
+        is_banned, is_admin = await touch_user_status(
             session,
-            user_id=callback.from_user.id,
-            username=callback.from_user.username,
-            first_name=callback.from_user.first_name,
-            last_name=callback.from_user.last_name,
+            user_id=from_user.id,
+            username=from_user.username,
+            first_name=from_user.first_name,
+            last_name=from_user.last_name,
         )
-        if user.is_banned:
+        if is_banned:
             await callback.answer("账号已被限制使用", show_alert=True)
             return
 
-        fav = await session.scalar(
-            select(Favorite).where(Favorite.user_id == user.id, Favorite.book_id == book_id)
+        # 先尝试删除：命中即为取消收藏，省去单独查询收藏与书籍的往返
+        removed = await session.scalar(
+            delete(Favorite)
+            .where(Favorite.user_id == from_user.id, Favorite.book_id == book_id)
+            .returning(Favorite.id)
+            .execution_options(synchronize_session=False)
         )
-        book = await session.scalar(select(Book).where(Book.id == book_id))
-        if not book:
-            await callback.answer("书籍不存在", show_alert=True)
-            return
-
-        if fav:
-            await session.delete(fav)
+        if removed is not None:
             await session.execute(
                 update(Book).where(Book.id == book_id, Book.favorite_count > 0).values(
                     favorite_count=Book.favorite_count - 1
                 )
             )
             await session.commit()
+            invalidate_book_card(book_id)
             try:
                 await callback.message.edit_reply_markup(
-                    reply_markup=build_user_book_keyboard(book_id=book_id, is_fav=False, is_admin=bool(user.is_admin))
+                    reply_markup=build_user_book_keyboard(book_id=book_id, is_fav=False, is_admin=is_admin)
                 )
             except Exception:
                 pass
             await callback.answer("已取消收藏")
             return
 
+        # 计数更新兼作书籍存在性校验
+        updated = await session.scalar(
+            update(Book)
+            .where(Book.id == book_id)
+            .values(favorite_count=Book.favorite_count + 1)
+            .returning(Book.id)
+            .execution_options(synchronize_session=False)
+        )
+        if updated is None:
+            await session.rollback()
+            await callback.answer("书籍不存在", show_alert=True)
+            return
+
         try:
-            session.add(Favorite(user_id=user.id, book_id=book_id))
-            await session.execute(
-                update(Book).where(Book.id == book_id).values(favorite_count=Book.favorite_count + 1)
-            )
+            session.add(Favorite(user_id=from_user.id, book_id=book_id))
             await session.commit()
+            invalidate_book_card(book_id)
         except IntegrityError:
             await session.rollback()
 
     try:
         await callback.message.edit_reply_markup(
-            reply_markup=build_user_book_keyboard(book_id=book_id, is_fav=True, is_admin=bool(user.is_admin))
+            reply_markup=build_user_book_keyboard(book_id=book_id, is_fav=True, is_admin=is_admin)
         )
     except Exception:
         pass
     await callback.answer("已加入收藏")
 
 
-async def get_booklist_selection(session, user_id: int, book_id: int) -> tuple[list[BookList], set[int]]:
-    booklists = await list_user_booklists(session, user_id)
-    selected_ids: set[int] = set()
-    for row in booklists:
-        for item in row.items or []:
-            if item.book_id == book_id:
-                selected_ids.add(row.id)
-                break
-    return booklists, selected_ids
-
-
-async def handle_booklist_callback(callback: CallbackQuery, action: str) -> None:
-    parts = action.split(":")
-    mode = parts[1]
+async def prompt_booklist_create(callback: CallbackQuery, book_id: int) -> None:
+    set_pending_action(callback.from_user.id, "booklist_create", book_id=book_id)
+    await callback.answer()
+    await callback.message.answer("请输入新书单名称，10分钟内有效。发送“取消”可放弃。")
 
-    if mode == "overview":
-        await show_booklist_overview(callback, int(parts[2]))
-        return
-    if mode == "new":
-        book_id = int(parts[2])
-        set_pending_action(callback.from_user.id, "booklist_create", book_id=book_id)
-        await callback.answer()
-        await callback.message.answer("请输入新书单名称，10分钟内有效。发送“取消”可放弃。")
-        return
-    if mode == "toggle":
-        _, _, book_id_raw, list_id_raw = parts
-        await toggle_book_in_booklist(callback, int(book_id_raw), int(list_id_raw))
-        return
-    if mode == "view":
-        _, _, book_id_raw, list_id_raw = parts
-        await show_single_booklist(callback, int(book_id_raw), int(list_id_raw))
-        return
-    if mode == "rename":
-        _, _, book_id_raw, list_id_raw = parts
-        set_pending_action(callback.from_user.id, "booklist_rename", book_id=int(book_id_raw), list_id=int(list_id_raw))
-        await callback.answer()
-        await callback.message.answer("请输入新的书单名称，10分钟内有效。发送“取消”可放弃。")
-        return
-    if mode == "delete":
-        _, _, book_id_raw, list_id_raw = parts
-        await delete_single_booklist(callback, int(book_id_raw), int(list_id_raw))
-        return
-    if mode == "share":
-        _, _, book_id_raw, list_id_raw = parts
-        await toggle_single_booklist_share(callback, int(book_id_raw), int(list_id_raw))
-        return
 
-    await show_booklist_menu(callback, int(parts[2]))
+async def prompt_booklist_rename(callback: CallbackQuery, book_id: int, list_id: int) -> None:
+    set_pending_action(callback.from_user.id, "booklist_rename", book_id=book_id, list_id=list_id)
+    await callback.answer()
+    await callback.message.answer("请输入新的书单名称，10分钟内有效。发送“取消”可放弃。")
 
 
 async def show_booklist_menu(callback: CallbackQuery, book_id: int) -> None:
@@ -855,11 +950,16 @@ async def show_booklist_menu(callback: CallbackQuery, book_id: int) -> None:
             first_name=callback.from_user.first_name,
             last_name=callback.from_user.last_name,
         )
-        booklists, selected_ids = await get_booklist_selection(session, callback.from_user.id, book_id)
+        selection = await get_booklist_selection(session, callback.from_user.id, book_id)
         await session.commit()
     try:
         await callback.message.edit_reply_markup(
-            reply_markup=build_booklist_keyboard(book_id=book_id, booklists=booklists, selected_ids=selected_ids)
+            reply_markup=build_booklist_keyboard(
+                book_id=book_id,
+                booklists=selection.booklists,
+                selected_ids=selection.selected_ids,
+                item_counts=selection.item_counts,
+            )
         )
     except TelegramBadRequest:
         pass
@@ -888,10 +988,15 @@ async def toggle_book_in_booklist(callback: CallbackQuery, book_id: int, list_id
             await add_book_to_booklist(session, list_id=list_id, book_id=book_id, added_by=callback.from_user.id)
             await session.commit()
             result_message = "已加入书单"
-        booklists, selected_ids = await get_booklist_selection(session, callback.from_user.id, book_id)
+        selection = await get_booklist_selection(session, callback.from_user.id, book_id)
     try:
         await callback.message.edit_reply_markup(
-            reply_markup=build_booklist_keyboard(book_id=book_id, booklists=booklists, selected_ids=selected_ids)
+            reply_markup=build_booklist_keyboard(
+                book_id=book_id,
+                booklists=selection.booklists,
+                selected_ids=selection.selected_ids,
+                item_counts=selection.item_counts,
+            )
         )
     except TelegramBadRequest:
         pass
@@ -932,10 +1037,16 @@ async def show_single_booklist(callback: CallbackQuery, book_id: int, list_id: i
             await callback.answer("书单不存在", show_alert=True)
             return
         title_lines = [f"📚 <b>{escape_html(booklist.name)}</b>"]
-        for idx, item in enumerate(booklist.items[:20], start=1):
-            book = await session.scalar(select(Book).where(Book.id == item.book_id))
-            if book:
-                title_lines.append(f"{idx:02d}. {escape_html(book.title)}")
+        items = booklist.items[:20]
+        # 一次 IN 查询取回整页书名，避免逐本查询
+        result = await session.execute(
+            select(Book.id, Book.title).where(Book.id.in_([item.book_id for item in items]))
+        )
+        titles = dict(result.all())
+        for idx, item in enumerate(items, start=1):
+            title = titles.get(item.book_id)
+            if title is not None:
+                title_lines.append(f"{idx:02d}. {escape_html(title)}")
         if len(title_lines) == 1:
             title_lines.append("当前书单暂无内容")
         if booklist.is_public and booklist.share_token:
@@ -975,25 +1086,12 @@ async def delete_single_booklist(callback: CallbackQuery, book_id: int, list_id:
     await show_booklist_overview(callback, book_id)
 
 
-async def handle_review_callback(callback: CallbackQuery, action: str) -> None:
-    parts = action.split(":")
-    mode = parts[1]
-    book_id = int(parts[2])
-
-    if mode == "review":
-        await show_review_menu(callback, book_id)
-        return
-    if mode == "review_rate":
-        rating = int(parts[3])
-        set_pending_action(callback.from_user.id, "review_comment", book_id=book_id, rating=rating)
-        await callback.answer()
-        await callback.message.answer(
-            f"你选择了 {rating} 星，请发送短评内容。\n发送 “-” 表示只评分不写短评，发送“取消”可放弃。"
-        )
-        return
-    if mode == "review_list":
-        await show_review_list(callback, book_id, int(parts[3]))
-        return
+async def prompt_review_comment(callback: CallbackQuery, book_id: int, rating: int) -> None:
+    set_pending_action(callback.from_user.id, "review_comment", book_id=book_id, rating=rating)
+    await callback.answer()
+    await callback.message.answer(
+        f"你选择了 {rating} 星，请发送短评内容。\n发送 “-” 表示只评分不写短评，发送“取消”可放弃。"
+    )
 
 
 async def show_review_menu(callback: CallbackQuery, book_id: int) -> None:
@@ -1072,10 +1170,8 @@ async def handle_share_book(callback: CallbackQuery, book_id: int) -> None:
 
 
 async def ensure_admin(callback: CallbackQuery) -> bool:
-    session_factory = get_session_factory()
-    async with session_factory() as session:
-        user = await session.scalar(select(User).where(User.id == callback.from_user.id))
-        return bool(user and user.is_admin)
+    user = await fetch_user_fast(callback.from_user.id)
+    return bool(user and user.is_admin)
 
 
 async def show_admin_edit_menu(callback: CallbackQuery, book_id: int) -> None:
@@ -1177,6 +1273,7 @@ async def handle_admin_tag_review(callback: CallbackQuery, book_id: int, applica
             approve=approve,
         )
         await session.commit()
+        invalidate_book_card(book_id)
         await sync_book_to_search(session, book_id=book_id)
     await callback.message.answer("已处理标签申请")
     await show_admin_tag_queue(callback, book_id)
@@ -1190,46 +1287,14 @@ async def handle_admin_tag_remove(callback: CallbackQuery, book_id: int, tag_id:
     async with session_factory() as session:
         await remove_tag_from_book(session, book_id=book_id, tag_id=tag_id, admin_id=callback.from_user.id)
         await session.commit()
+        invalidate_book_card(book_id)
         await sync_book_to_search(session, book_id=book_id)
     await callback.message.answer("标签已移除")
 
 
-async def record_download(
-    *,
-    user_id: int,
-    username: Optional[str],
-    first_name: str,
-    last_name: Optional[str],
-    book_id: int,
-    file_hash: str,
-) -> None:
-    session_factory = get_session_factory()
-    async with session_factory() as session:
-        user = await ensure_user_record(
-            session,
-            user_id=user_id,
-            username=username,
-            first_name=first_name,
-            last_name=last_name,
-        )
-        book = await session.scalar(select(Book).where(Book.id == book_id))
-        if book:
-            book.download_count += 1
-        user.download_count += 1
-        session.add(
-            DownloadLog(
-                user_id=user_id,
-                book_id=book_id,
-                file_hash=file_hash,
-                cost_coins=0,
-                is_free=True,
-            )
-        )
-        await session.commit()
-
-
-async def handle_report(callback: CallbackQuery, book_id: int):
-    keyboard = InlineKeyboardMarkup(
+@lru_cache(maxsize=4096)
+def build_report_keyboard(book_id: int) -> InlineKeyboardMarkup:
+    return InlineKeyboardMarkup(
         inline_keyboard=[
             [InlineKeyboardButton(text="侵权/色情", callback_data=f"report:{book_id}:infringement")],
             [InlineKeyboardButton(text="政治敏感", callback_data=f"report:{book_id}:political")],
@@ -1237,7 +1302,10 @@ async def handle_report(callback: CallbackQuery, book_id: int):
             [InlineKeyboardButton(text="返回详情", callback_data=f"book:restore:{book_id}")],
         ]
     )
-    await callback.message.answer("请选择举报原因：", reply_markup=keyboard)
+
+
+async def handle_report(callback: CallbackQuery, book_id: int):
+    await callback.message.answer("请选择举报原因：", reply_markup=build_report_keyboard(book_id))
     await callback.answer()
 
 
@@ -1256,3 +1324,35 @@ async def on_report_reason(callback: CallbackQuery):
 
     logger.warning(f"收到举报: book_id={book_id} reason={reason} from_user={callback.from_user.id}")
     await callback.answer("已收到举报", show_alert=True)
+
+
+# 回调动作 -> 处理函数，参数为书籍 ID 及其后的回调字段 (纯数字字段转为 int)
+_BOOK_ACTIONS: dict[str, Callable[..., Awaitable[None]]] = {
+    "detail": show_book_detail,
+    "download": handle_download,
+    "restore": restore_keyboard,
+    "fav": handle_favorite,
+    "booklist": show_booklist_menu,
+    "booklist_overview": show_booklist_overview,
+    "booklist_new": prompt_booklist_create,
+    "booklist_toggle": toggle_book_in_booklist,
+    "booklist_view": show_single_booklist,
+    "booklist_rename": prompt_booklist_rename,
+    "booklist_delete": delete_single_booklist,
+    "booklist_share": toggle_single_booklist_share,
+    "review": show_review_menu,
+    "review_rate": prompt_review_comment,
+    "review_list": show_review_list,
+    "similar": show_similar_books,
+    "tagadd": prompt_tag_application,
+    "more": show_more_menu,
+    "share": handle_share_book,
+    "report": handle_report,
+    "admin_edit": show_admin_edit_menu,
+    "admin_edit_field": prompt_admin_edit,
+    "admin_history": show_admin_history,
+    "admin_tag_queue": show_admin_tag_queue,
+    "admin_tag_approve": partial(handle_admin_tag_review, approve=True),
+    "admin_tag_reject": partial(handle_admin_tag_review, approve=False),
+    "admin_tag_remove": handle_admin_tag_remove,
+}
@@ -7,6 +7,7 @@
 import asyncio
 
 from aiogram import Router, F
+from cachetools import TTLCache
 from aiogram.filters import Command
 from aiogram.types import Message, CallbackQuery, InlineKeyboardMarkup, InlineKeyboardButton
 
@@ -15,7 +16,8 @@ from app.core.logger import logger
 from app.core.database import get_session_factory
 from app.core.models import User, Book, BookStatus
 from app.core.deeplink import decode_payload
-from sqlalchemy import select, func
+from sqlalchemy import BigInteger, cast, column, func, select, table
+from sqlalchemy.dialects.postgresql import REGCLASS, insert as pg_insert
 from app.handlers.book_detail import send_book_card, show_public_booklist
 from app.handlers.invite import parse_invite_code, bind_invite_relation
 
@@ -59,31 +61,62 @@ HELP_KEYBOARD = InlineKeyboardMarkup(
 )
 
 
+START_WELCOME_TEXT = (
+    "搜书神器是一个免费的 Telegram 机器人，致力于让每个人都能自由获取知识。我们提供了优秀的分享型文化内容，希望打造高质量的知识共享平台，让所有人都能轻松阅读。\n\n"
+    "发送 /s 关键词 直接搜索书名，作者\n"
+    "发送 /ss 关键词 可以搜索主角，标签\n\n"
+    "更多帮助请点击: /help"
+)
+
+ABOUT_TEXT = """
+🤖 <b>搜书神器 V2</b>
+
+<b>版本:</b> 2.0.1
+<b>技术栈:</b> Python 3.11, aiogram 3.x, PostgreSQL, Meilisearch
+
+<b>开源协议:</b> MIT License
+
+<b>致谢:</b>
+• Telegram Bot API
+• aiogram 开发团队
+• Meilisearch 搜索引擎
+• 所有贡献者
+
+© 2024 搜书神器. All rights reserved.
+"""
+
+GOTO_SEARCH_TEXT = (
+    "🔍 <b>开始搜索</b>\n\n"
+    "请直接发送关键词，或使用:\n"
+    "• <code>/s 关键词</code> - 搜索书名/作者\n"
+    "• <code>/ss 关键词</code> - 搜索标签/主角"
+)
+
+
 @common_router.message(Command("start"))
 async def cmd_start(message: Message):
     """处理 /start 命令"""
-    async def ensure_user() -> User:
+    async def ensure_user() -> None:
+        # 已注册用户无需读取，单条 INSERT ... ON CONFLICT DO NOTHING 即可，并发首次点击也不会冲突
         tg_user = message.from_user
+        stmt = (
+            pg_insert(User)
+            .values(
+                id=tg_user.id,
+                username=tg_user.username,
+                first_name=tg_user.first_name,
+                last_name=tg_user.last_name,
+                coins=0,
+                upload_count=0,
+                download_count=0,
+                search_count=0,
+            )
+            .on_conflict_do_nothing(index_elements=[User.id])
+        )
         session_factory = get_session_factory()
         async with session_factory() as session:
-            stmt = select(User).where(User.id == tg_user.id)
-            result = await session.execute(stmt)
-            user = result.scalar_one_or_none()
-            if not user:
-                user = User(
-                    id=tg_user.id,
-                    username=tg_user.username,
-                    first_name=tg_user.first_name,
-                    last_name=tg_user.last_name,
-                    coins=0,
-                    upload_count=0,
-                    download_count=0,
-                    search_count=0,
-                )
-                session.add(user)
-                await session.commit()
-                await session.refresh(user)
-            return user
+            await session.execute(stmt)
+            await session.commit()
 
     payload = ""
     parts = (message.text or "").split(maxsplit=1)
@@ -95,10 +128,10 @@ async def cmd_start(message: Message):
             await message.answer("⚠️ 无效或过期的邀请码")
         else:
             try:
-                current_user = await asyncio.wait_for(ensure_user(), timeout=3)
+                await asyncio.wait_for(ensure_user(), timeout=3)
                 bound = await bind_invite_relation(
                     inviter_id=inviter_id,
-                    invitee_id=current_user.id,
+                    invitee_id=message.from_user.id,
                 )
                 if bound:
                     await message.answer("✅ 邀请绑定成功，邀请人已获得奖励")
@@ -140,13 +173,7 @@ async def cmd_start(message: Message):
         )
         return
 
-    welcome_text = (
-        "搜书神器是一个免费的 Telegram 机器人，致力于让每个人都能自由获取知识。我们提供了优秀的分享型文化内容，希望打造高质量的知识共享平台，让所有人都能轻松阅读。\n\n"
-        "发送 /s 关键词 直接搜索书名，作者\n"
-        "发送 /ss 关键词 可以搜索主角，标签\n\n"
-        "更多帮助请点击: /help"
-    )
-    await message.answer(welcome_text)
+    await message.answer(START_WELCOME_TEXT)
 
     async def ensure_user_with_timeout() -> None:
         try:
@@ -171,47 +198,79 @@ async def cmd_help(message: Message):
 @common_router.message(Command("about"))
 async def cmd_about(message: Message):
     """处理 /about 命令"""
-    about_text = f"""
-🤖 <b>搜书神器 V2</b>
+    await message.answer(ABOUT_TEXT)
 
-<b>版本:</b> 2.0.1
-<b>技术栈:</b> Python 3.11, aiogram 3.x, PostgreSQL, Meilisearch
 
-<b>开源协议:</b> MIT License
+# 书籍/用户总数取 pg_class.reltuples 估算值 (由 autovacuum/ANALYZE 维护)，避免全表 COUNT
+_PG_CLASS = table("pg_class", column("oid"), column("reltuples"))
 
-<b>致谢:</b>
-• Telegram Bot API
-• aiogram 开发团队
-• Meilisearch 搜索引擎
-• 所有贡献者
 
-© 2024 搜书神器. All rights reserved.
-"""
-    await message.answer(about_text)
+def _row_estimate(table_name: str):
+    return (
+        select(cast(_PG_CLASS.c.reltuples, BigInteger))
+        .where(_PG_CLASS.c.oid == cast(table_name, REGCLASS))
+        .scalar_subquery()
+    )
 
 
-@common_router.message(Command("info"))
-async def cmd_info(message: Message):
+# 估算值与非正常状态书籍计数 (通常很少，走状态索引) 合并为一条语句，一次往返
+_NON_ACTIVE_STATUSES = (BookStatus.PENDING, BookStatus.HIDDEN, BookStatus.BANNED)
+_INFO_STATS_STMT = (
+    select(
+        _row_estimate(Book.__tablename__).label("books"),
+        _row_estimate(User.__tablename__).label("users"),
+        func.count().filter(Book.status == BookStatus.PENDING).label("pending"),
+        func.count().filter(Book.status != BookStatus.PENDING).label("failed"),
+    )
+    .select_from(Book)
+    .where(Book.status.in_(_NON_ACTIVE_STATUSES))
+)
+
+
+# /info 统计变化缓慢，渲染好的文本短时缓存；锁保证并发刷新只查询一次
+INFO_CACHE: TTLCache[str, str] = TTLCache(maxsize=1, ttl=120)
+_INFO_LOCK = asyncio.Lock()
+
+
+async def get_info_text() -> str:
+    text = INFO_CACHE.get("info")
+    if text is not None:
+        return text
+    async with _INFO_LOCK:
+        text = INFO_CACHE.get("info")
+        if text is None:
+            text = await build_info_text()
+            INFO_CACHE["info"] = text
+    return text
+
+
+async def build_info_text() -> str:
     session_factory = get_session_factory()
     async with session_factory() as session:
-        total_books = await session.scalar(select(func.count()).select_from(Book)) or 0
-        active_books = await session.scalar(
-            select(func.count()).select_from(Book).where(Book.status == BookStatus.ACTIVE)
-        ) or 0
-        pending_books = await session.scalar(
-            select(func.count()).select_from(Book).where(Book.status == BookStatus.PENDING)
-        ) or 0
-        total_users = await session.scalar(select(func.count()).select_from(User)) or 0
-
-    failed_books = max(total_books - active_books - pending_books, 0)
-    text = (
+        stats = (await session.execute(_INFO_STATS_STMT)).one()
+        total_books, total_users = stats.books, stats.users
+        # 从未 ANALYZE 过的表估算值为 -1/0，此时表还很小，直接精确计数
+        if total_books <= 0:
+            total_books = await session.scalar(select(func.count()).select_from(Book)) or 0
+        if total_users <= 0:
+            total_users = await session.scalar(select(func.count()).select_from(User)) or 0
+
+    pending_books, failed_books = stats.pending, stats.failed
+    # 估算总数可能略小于精确计数的非正常书籍数
+    total_books = max(total_books, pending_books + failed_books)
+    active_books = total_books - pending_books - failed_books
+    return (
         f"书库统计:\n"
         f"书籍: {total_books}\n"
         f"用户: {total_users}\n\n"
         f"排队({pending_books}) 成功({active_books}) 失败({failed_books})\n"
         f"发送 /info 查看书库统计和上传进度"
     )
-    await message.answer(text)
+
+
+@common_router.message(Command("info"))
+async def cmd_info(message: Message):
+    await message.answer(await get_info_text())
 
 
 @common_router.message(Command("review"))
@@ -266,10 +325,5 @@ async def on_close(callback: CallbackQuery):
 @common_router.callback_query(F.data == "goto:search")
 async def on_goto_search(callback: CallbackQuery):
     """跳转到搜索"""
-    await callback.message.edit_text(
-        "🔍 <b>开始搜索</b>\n\n"
-        "请直接发送关键词，或使用:\n"
-        "• <code>/s 关键词</code> - 搜索书名/作者\n"
-        "• <code>/ss 关键词</code> - 搜索标签/主角"
-    )
+    await callback.message.edit_text(GOTO_SEARCH_TEXT)
     await callback.answer()
@@ -4,10 +4,11 @@
 处理 /yanzheng 入群验证码命令
 """
 
-import random
+import heapq
+import secrets
 import string
 from datetime import datetime, timedelta
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Tuple
 
 from aiogram import Router, F
 from aiogram.filters import Command
@@ -16,12 +17,13 @@ from aiogram.types import Message, ChatJoinRequest
 from app.core.logger import logger
 from app.core.database import get_session_factory
 from app.core.models import User
-from sqlalchemy import select
 
 group_verify_router = Router(name="group_verify")
 
 # 验证码缓存 (用户ID -> 验证码信息)
 _verification_codes: Dict[int, dict] = {}
+# 过期索引 (过期时间, 用户ID) 小顶堆，清理时只弹出已过期的条目
+_expiry_heap: List[Tuple[datetime, int]] = []
 
 
 class VerificationCode:
@@ -38,11 +40,13 @@ class VerificationCode:
         return datetime.now() > self.expires_at
 
 
+# 验证码字符集：数字和大写字母，排除易混淆的字符；恰好 32 个，随机字节取低 5 位即无偏
+_CODE_ALPHABET = b"ABCDEFGHJKLMNPQRSTUVWXYZ23456789"
+
+
 def generate_verification_code(length: int = 6) -> str:
-    """生成随机验证码"""
-    # 使用数字和大写字母，排除易混淆的字符
-    characters = "ABCDEFGHJKLMNPQRSTUVWXYZ23456789"
-    return ''.join(random.choices(characters, k=length))
+    """生成随机验证码 (使用系统安全随机源)"""
+    return bytes(_CODE_ALPHABET[b & 31] for b in secrets.token_bytes(length)).decode("ascii")
 
 
 @group_verify_router.message(Command("yanzheng"))
@@ -84,6 +88,7 @@ async def generate_new_code(message: Message, user_id: int):
         "expires_at": expires_at,
         "is_used": False
     }
+    heapq.heappush(_expiry_heap, (expires_at, user_id))
 
     # 发送验证码给用户
     await message.answer(
@@ -155,16 +160,17 @@ async def verify_code(message: Message, user_id: int, input_code: str):
 
 def cleanup_expired_codes():
     """清理过期的验证码"""
-    global _verification_codes
     current_time = datetime.now()
-    expired_users = [
-        user_id for user_id, code_info in _verification_codes.items()
-        if current_time > code_info["expires_at"]
-    ]
-    for user_id in expired_users:
-        del _verification_codes[user_id]
-    if expired_users:
-        logger.info(f"清理了 {len(expired_users)} 个过期的验证码")
+    removed = 0
+    while _expiry_heap and current_time > _expiry_heap[0][0]:
+        _, user_id = heapq.heappop(_expiry_heap)
+        # 用户可能已重新获取验证码，堆中旧条目只在记录确实过期时才删除
+        code_info = _verification_codes.get(user_id)
+        if code_info and current_time > code_info["expires_at"]:
+            del _verification_codes[user_id]
+            removed += 1
+    if removed:
+        logger.info(f"清理了 {removed} 个过期的验证码")
 
 
 @group_verify_router.message(Command("code_status"))
@@ -176,7 +182,7 @@ async def cmd_code_status(message: Message):
 
     session_factory = get_session_factory()
     async with session_factory() as session:
-        user = await session.scalar(select(User).where(User.id == user_id))
+        user = await session.get(User, user_id)
         if not (user and user.is_admin):
             await message.answer("❌ 您没有权限执行此命令")
             return
@@ -17,7 +17,7 @@ from aiogram.types import (
     InlineKeyboardMarkup,
     InlineKeyboardButton,
 )
-from sqlalchemy import select, func
+from sqlalchemy import exists, select, func
 from sqlalchemy.exc import IntegrityError
 
 from app.core.config import get_settings
@@ -72,7 +72,7 @@ async def _ensure_user(
 ) -> User:
     session_factory = get_session_factory()
     async with session_factory() as session:
-        user = await session.scalar(select(User).where(User.id == user_id))
+        user = await session.get(User, user_id)
         if user:
             return user
 
@@ -106,15 +106,15 @@ async def bind_invite_relation(
 
     session_factory = get_session_factory()
     async with session_factory() as session:
-        inviter = await session.scalar(select(User).where(User.id == inviter_id))
-        invitee = await session.scalar(select(User).where(User.id == invitee_id))
+        inviter = await session.get(User, inviter_id)
+        invitee = await session.get(User, invitee_id)
         if not inviter or not invitee:
             return False
 
-        existing = await session.scalar(
-            select(InviteRelation).where(InviteRelation.invitee_id == invitee_id)
+        already_invited = await session.scalar(
+            select(exists().where(InviteRelation.invitee_id == invitee_id))
         )
-        if existing:
+        if already_invited:
             return False
 
         try:
@@ -246,6 +246,28 @@ async def cmd_my(message: Message):
     logger.info(f"用户 {message.from_user.id} 查看了邀请链接")
 
 
+INVITE_HELP_TEXT = """
+❔ <b>邀请奖励说明</b>
+
+🎆 <b>如何获得奖励?</b>
+1. 分享您的专属邀请链接给好友
+2. 好友通过链接注册并加入Bot
+3. 您将获得邀请奖励书币
+
+💵 <b>奖励明细</b>
+• 基础邀请奖: 10 书币/人
+• 奖励实时结算并入账
+
+⚠️ <b>注意事项</b>
+• 禁止刷量，违规将封号
+• 邀请奖励仅首次绑定有效
+"""
+
+INVITE_BACK_KEYBOARD = InlineKeyboardMarkup(inline_keyboard=[
+    [InlineKeyboardButton(text="◀️ 返回", callback_data="invite:back")],
+])
+
+
 @invite_router.callback_query(F.data == "invite:stats")
 async def on_invite_stats(callback: CallbackQuery):
     """显示详细邀请统计"""
@@ -266,39 +288,14 @@ async def on_invite_stats(callback: CallbackQuery):
 • 预估月收益: {stats['this_month'] * 10} 书币
 """
 
-    keyboard = InlineKeyboardMarkup(inline_keyboard=[
-        [InlineKeyboardButton(text="◀️ 返回", callback_data="invite:back")],
-    ])
-
-    await callback.message.edit_text(text, reply_markup=keyboard)
+    await callback.message.edit_text(text, reply_markup=INVITE_BACK_KEYBOARD)
     await callback.answer()
 
 
 @invite_router.callback_query(F.data == "invite:help")
 async def on_invite_help(callback: CallbackQuery):
     """显示奖励说明"""
-    text = """
-❔ <b>邀请奖励说明</b>
-
-🎆 <b>如何获得奖励?</b>
-1. 分享您的专属邀请链接给好友
-2. 好友通过链接注册并加入Bot
-3. 您将获得邀请奖励书币
-
-💵 <b>奖励明细</b>
-• 基础邀请奖: 10 书币/人
-• 奖励实时结算并入账
-
-⚠️ <b>注意事项</b>
-• 禁止刷量，违规将封号
-• 邀请奖励仅首次绑定有效
-"""
-
-    keyboard = InlineKeyboardMarkup(inline_keyboard=[
-        [InlineKeyboardButton(text="◀️ 返回", callback_data="invite:back")],
-    ])
-
-    await callback.message.edit_text(text, reply_markup=keyboard)
+    await callback.message.edit_text(INVITE_HELP_TEXT, reply_markup=INVITE_BACK_KEYBOARD)
     await callback.answer()
 
 
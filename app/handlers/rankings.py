@@ -4,6 +4,7 @@
 处理 /top 排行榜命令
 """
 
+from datetime import datetime
 from typing import Optional
 
 from aiogram import Router, F
@@ -117,7 +118,6 @@ async def show_new_ranking(message, user_id: int):
     text = "🆕 <b>最新上传榜 Top 10</b>\n\n"
 
     if response.hits:
-        from datetime import datetime
         for i, book in enumerate(response.hits[:10], 1):
             emoji = "🥇" if i == 1 else "🥈" if i == 2 else "🥉" if i == 3 else f"{i}."
             text += f"{emoji} <b>{escape_html(book.title)}</b>\n"
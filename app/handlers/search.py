@@ -20,7 +20,7 @@ from aiogram.exceptions import TelegramAPIError
 
 from app.core.logger import logger
 from app.core.config import get_settings
-from app.core.text import escape_html
+from app.core.text import escape_html, format_size, format_word_count
 from app.services.search import (
     get_search_service,
     SearchFilters,
@@ -106,30 +106,6 @@ RATING_FLAGS = {
 }
 
 
-def format_size(size_bytes: int) -> str:
-    """格式化文件大小"""
-    if size_bytes < 1024:
-        return f"{size_bytes}B"
-    elif size_bytes < 1024 * 1024:
-        kb = round(size_bytes / 1024, 1)
-        return f"{int(kb)}KB" if float(kb).is_integer() else f"{kb:.1f}KB"
-    else:
-        mb = round(size_bytes / (1024 * 1024), 1)
-        return f"{int(mb)}MB" if float(mb).is_integer() else f"{mb:.1f}MB"
-
-
-def format_word_count(count: int) -> str:
-    """格式化字数"""
-    if count < 10000:
-        return f"{count}"
-    elif count < 100000000:
-        value = count / 10000
-        value = int(value * 10) / 10
-        return f"{value:.1f}万"
-    else:
-        return f"{count / 100000000:.1f}亿"
-
-
 def get_rating_stars(score: float) -> str:
     """获取评分星星显示"""
     full_stars = int(score / 2)
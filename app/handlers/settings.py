@@ -50,7 +50,7 @@ async def get_user_settings(user_id: int) -> UserSettings:
 async def save_user_settings(user_id: int, settings: UserSettings):
     session_factory = get_session_factory()
     async with session_factory() as session:
-        user = await session.scalar(select(User).where(User.id == user_id))
+        user = await session.get(User, user_id)
         if not user:
             user = User(
                 id=user_id,
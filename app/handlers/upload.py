@@ -251,9 +251,7 @@ async def handle_document(message: Message):
         session_factory = get_session_factory()
         async with session_factory() as session:
             # 4.1 检查/创建用户
-            stmt = select(User).where(User.id == user.id)
-            result = await session.execute(stmt)
-            db_user = result.scalar_one_or_none()
+            db_user = await session.get(User, user.id)
             
             if not db_user:
                 db_user = User(
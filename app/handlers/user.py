@@ -11,11 +11,11 @@ from aiogram.types import Message, CallbackQuery
 from aiogram.filters import Command
 
 from app.core.logger import logger
-from app.core.database import get_session_factory
-from app.core.models import User, Favorite, Book, DownloadLog
+from app.core.database import fetch_user_fast, get_session_factory
+from app.core.models import User, Favorite, Book, DownloadLog, user_level_str
 from app.core.text import escape_html
 from sqlalchemy import select, func
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import load_only, selectinload
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 
 user_router = Router(name="user")
@@ -30,9 +30,7 @@ async def cmd_me(message: Message):
     async def load():
         session_factory = get_session_factory()
         async with session_factory() as session:
-            stmt = select(User).where(User.id == tg_user.id)
-            result = await session.execute(stmt)
-            user = result.scalar_one_or_none()
+            user = await session.get(User, tg_user.id)
             if not user:
                 user = User(
                     id=tg_user.id,
@@ -71,7 +69,7 @@ async def cmd_me(message: Message):
 
 💰 <b>账户信息</b>
 ├ 书币余额: <code>{user.coins} 🪙</code>
-└ 等级: <code>{user.level.value}</code>
+└ 等级: <code>{user_level_str(user.level)}</code>
 
 📊 <b>数据统计</b>
 ├ 上传书籍: <code>{user.upload_count} 本</code>
@@ -94,11 +92,13 @@ async def cmd_coins(message: Message):
     status = await message.answer("⏳ 正在查询余额...")
 
     async def load():
+        # 已注册用户走只读快速路径，仅新用户需要会话写入
+        row = await fetch_user_fast(tg_user.id)
+        if row:
+            return row
         session_factory = get_session_factory()
         async with session_factory() as session:
-            stmt = select(User).where(User.id == tg_user.id)
-            result = await session.execute(stmt)
-            user = result.scalar_one_or_none()
+            user = await session.get(User, tg_user.id)
             if not user:
                 user = User(
                     id=tg_user.id,
@@ -153,9 +153,7 @@ async def cmd_favorites(message: Message):
     async def load():
         session_factory = get_session_factory()
         async with session_factory() as session:
-            stmt = select(User).where(User.id == tg_user.id)
-            result = await session.execute(stmt)
-            user = result.scalar_one_or_none()
+            user = await fetch_user_fast(tg_user.id)
             if not user:
                 return None, []
 
@@ -163,7 +161,7 @@ async def cmd_favorites(message: Message):
                 select(Favorite)
                 .where(Favorite.user_id == user.id)
                 .order_by(Favorite.created_at.desc())
-                .options(selectinload(Favorite.book))
+                .options(selectinload(Favorite.book).load_only(Book.id, Book.title, Book.author, raiseload=True))
                 .limit(20)
             )
             result = await session.execute(stmt)
@@ -243,7 +241,11 @@ async def cmd_history(message: Message):
             book_ids = [log.book_id for log in logs]
             books_by_id: dict[int, Book] = {}
             if book_ids:
-                result = await session.execute(select(Book).where(Book.id.in_(book_ids)))
+                result = await session.execute(
+                    select(Book)
+                    .where(Book.id.in_(book_ids))
+                    .options(load_only(Book.id, Book.title, raiseload=True))
+                )
                 for book in result.scalars().all():
                     books_by_id[book.id] = book
             return logs, books_by_id
@@ -9,12 +9,12 @@ from __future__ import annotations
 import secrets
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Optional
+from typing import Any, Optional
 
-from sqlalchemy import case, func, or_, select
+from sqlalchemy import case, delete, exists, func, or_, select, update
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import joinedload, load_only, selectinload
 
 from app.core.models import (
     Book,
@@ -51,7 +51,7 @@ async def ensure_user_record(
     first_name: str,
     last_name: Optional[str],
 ) -> User:
-    user = await session.scalar(select(User).where(User.id == user_id))
+    user = await session.get(User, user_id)
     if user:
         if username is not None:
             user.username = username
@@ -75,6 +75,55 @@ async def ensure_user_record(
     return user
 
 
+async def touch_user_status(
+    session: AsyncSession,
+    *,
+    user_id: int,
+    username: Optional[str],
+    first_name: str,
+    last_name: Optional[str],
+) -> tuple[bool, bool]:
+    """刷新用户资料并返回 (is_banned, is_admin)
+
+    已注册用户只读取一行，资料确有变化时才写库；新用户回退到 ensure_user_record 创建。
+    """
+    row = (
+        await session.execute(
+            select(User.is_banned, User.is_admin, User.username, User.first_name, User.last_name)
+            .where(User.id == user_id)
+        )
+    ).first()
+    if row is None:
+        user = await ensure_user_record(
+            session,
+            user_id=user_id,
+            username=username,
+            first_name=first_name,
+            last_name=last_name,
+        )
+        return bool(user.is_banned), bool(user.is_admin)
+
+    values: dict[str, Any] = {}
+    if username is not None and username != row.username:
+        values["username"] = username
+    if first_name and first_name != row.first_name:
+        values["first_name"] = first_name
+    if last_name != row.last_name:
+        values["last_name"] = last_name
+    if values:
+        # 并发请求已写入相同资料时条件不成立，不再重复改写该行
+        await session.execute(
+            update(User)
+            .where(
+                User.id == user_id,
+                or_(*(getattr(User, name).is_distinct_from(value) for name, value in values.items())),
+            )
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+    return bool(row.is_banned), bool(row.is_admin)
+
+
 def generate_booklist_share_token() -> str:
     return secrets.token_urlsafe(12).replace("-", "A").replace("_", "B")[:20]
 
@@ -109,6 +158,34 @@ async def list_user_booklists(session: AsyncSession, user_id: int) -> list[BookL
     return list(result.scalars().all())
 
 
+@dataclass
+class BooklistSelection:
+    booklists: list[BookList]
+    item_counts: dict[int, int]
+    selected_ids: set[int]
+
+
+async def get_booklist_selection(session: AsyncSession, user_id: int, book_id: int) -> BooklistSelection:
+    """一条聚合查询取回用户书单、各书单条目数及是否已包含指定书籍 (不加载条目本身)"""
+    await get_or_create_default_booklist(session, user_id)
+    item_count = func.count(BookListItem.id)
+    contains_book = func.count(BookListItem.id).filter(BookListItem.book_id == book_id)
+    result = await session.execute(
+        select(BookList, item_count, contains_book)
+        .outerjoin(BookListItem, BookListItem.list_id == BookList.id)
+        .where(BookList.user_id == user_id)
+        .group_by(BookList.id)
+        .order_by(BookList.is_default.desc(), BookList.created_at.asc())
+    )
+    selection = BooklistSelection(booklists=[], item_counts={}, selected_ids=set())
+    for booklist, count, contains in result.all():
+        selection.booklists.append(booklist)
+        selection.item_counts[booklist.id] = count
+        if contains:
+            selection.selected_ids.add(booklist.id)
+    return selection
+
+
 async def create_booklist(session: AsyncSession, user_id: int, name: str) -> BookList:
     clean_name = (name or "").strip()
     if not clean_name:
@@ -176,10 +253,12 @@ async def add_book_to_booklist(
     book_id: int,
     added_by: int,
 ) -> bool:
-    exists = await session.scalar(
-        select(BookListItem).where(BookListItem.list_id == list_id, BookListItem.book_id == book_id)
+    already_added = await session.scalar(
+        select(
+            exists().where(BookListItem.list_id == list_id, BookListItem.book_id == book_id)
+        )
     )
-    if exists:
+    if already_added:
         return False
     session.add(BookListItem(list_id=list_id, book_id=book_id, added_by=added_by))
     await session.flush()
@@ -187,21 +266,24 @@ async def add_book_to_booklist(
 
 
 async def remove_book_from_booklist(session: AsyncSession, *, list_id: int, book_id: int) -> bool:
-    row = await session.scalar(
-        select(BookListItem).where(BookListItem.list_id == list_id, BookListItem.book_id == book_id)
+    removed = await session.scalar(
+        delete(BookListItem)
+        .where(BookListItem.list_id == list_id, BookListItem.book_id == book_id)
+        .returning(BookListItem.id)
+        .execution_options(synchronize_session=False)
     )
-    if not row:
-        return False
-    await session.delete(row)
-    await session.flush()
-    return True
+    return removed is not None
 
 
 async def get_public_booklist(session: AsyncSession, share_token: str) -> Optional[BookList]:
     return await session.scalar(
         select(BookList)
         .where(BookList.share_token == share_token, BookList.is_public.is_(True))
-        .options(selectinload(BookList.items).selectinload(BookListItem.book))
+        .options(
+            selectinload(BookList.items)
+            .selectinload(BookListItem.book)
+            .load_only(Book.id, Book.title, raiseload=True)
+        )
     )
 
 
@@ -244,7 +326,7 @@ async def recompute_book_rating(session: AsyncSession, *, book_id: int) -> None:
         )
     ).one()
     count, avg_rating, comment_count = row
-    book = await session.scalar(select(Book).where(Book.id == book_id))
+    book = await session.get(Book, book_id)
     if not book:
         raise ValueError("书籍不存在")
     book.rating_count = int(count or 0)
@@ -285,20 +367,24 @@ async def submit_tag_application(
     if len(clean_name) > 50:
         raise ValueError("标签长度不能超过50个字符")
 
-    existing_tag = await session.scalar(select(Tag).where(Tag.name == clean_name))
-    if existing_tag:
-        linked = await session.scalar(
-            select(BookTag).where(BookTag.book_id == book_id, BookTag.tag_id == existing_tag.id)
+    linked = await session.scalar(
+        select(
+            exists()
+            .where(BookTag.book_id == book_id, BookTag.tag_id == Tag.id)
+            .where(Tag.name == clean_name)
         )
-        if linked:
-            raise ValueError("该标签已存在")
+    )
+    if linked:
+        raise ValueError("该标签已存在")
 
     pending = await session.scalar(
-        select(TagApplication).where(
-            TagApplication.user_id == user_id,
-            TagApplication.book_id == book_id,
-            TagApplication.tag_name == clean_name,
-            TagApplication.status == "pending",
+        select(
+            exists().where(
+                TagApplication.user_id == user_id,
+                TagApplication.book_id == book_id,
+                TagApplication.tag_name == clean_name,
+                TagApplication.status == "pending",
+            )
         )
     )
     if pending:
@@ -394,7 +480,7 @@ async def edit_book_field(
     field_name: str,
     raw_value: str,
 ) -> Book:
-    book = await session.scalar(select(Book).where(Book.id == book_id))
+    book = await session.get(Book, book_id)
     if not book:
         raise ValueError("书籍不存在")
 
@@ -457,7 +543,7 @@ async def sync_book_to_search(session: AsyncSession, *, book_id: int) -> None:
     book = await session.scalar(
         select(Book)
         .where(Book.id == book_id)
-        .options(selectinload(Book.file), selectinload(Book.book_tags).selectinload(BookTag.tag))
+        .options(joinedload(Book.file, innerjoin=True), selectinload(Book.book_tags).selectinload(BookTag.tag))
     )
     if not book or not book.file:
         return
@@ -502,10 +588,13 @@ async def get_similar_books(
 
     tag_names = [bt.tag.name for bt in (book.book_tags or []) if bt.tag and bt.tag.name]
     result_map: dict[int, Book] = {}
+    # 推荐列表只展示书名，不取简介等大字段
+    list_columns = load_only(Book.id, Book.title, raiseload=True)
 
     if tag_names:
         tag_query = (
             select(Book)
+            .options(list_columns)
             .join(BookTag, Book.id == BookTag.book_id)
             .join(Tag, Tag.id == BookTag.tag_id)
             .where(Book.id != book_id, Tag.name.in_(tag_names))
@@ -518,6 +607,7 @@ async def get_similar_books(
     if len(result_map) < per_page * page and book.author:
         author_query = (
             select(Book)
+            .options(list_columns)
             .where(Book.id != book_id, Book.author == book.author)
             .order_by(Book.download_count.desc(), Book.favorite_count.desc(), Book.created_at.desc())
             .limit(per_page * 4)
@@ -528,6 +618,7 @@ async def get_similar_books(
     if len(result_map) < per_page * page:
         hot_query = (
             select(Book)
+            .options(list_columns)
             .where(Book.id != book_id)
             .order_by(Book.download_count.desc(), Book.favorite_count.desc(), Book.created_at.desc())
             .limit(per_page * 4)
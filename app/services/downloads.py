@@ -0,0 +1,216 @@
+# -*- coding: utf-8 -*-
+"""
+搜书神器 V2 - 下载记录服务
+下载事件先进入内存队列，由后台任务按批合并写库
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections import Counter
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy import bindparam, func, insert, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app.core.database import get_session_factory
+from app.core.logger import logger
+from app.core.models import Book, DownloadLog, User
+
+# 单批最多合并的事件数与最长等待时间 (秒)
+FLUSH_BATCH_SIZE = 500
+FLUSH_INTERVAL = 1.0
+
+
+@dataclass(frozen=True)
+class DownloadEvent:
+    user_id: int
+    username: Optional[str]
+    first_name: str
+    last_name: Optional[str]
+    book_id: int
+    file_hash: str
+
+
+# executemany 语句：计数按批次增量累加，资料字段只在有值时覆盖
+_USER_COUNTER_STMT = (
+    update(User.__table__)
+    .where(User.__table__.c.id == bindparam("b_user_id"))
+    .values(
+        download_count=User.__table__.c.download_count + bindparam("b_count"),
+        username=func.coalesce(bindparam("b_username"), User.__table__.c.username),
+        first_name=func.coalesce(func.nullif(bindparam("b_first_name"), ""), User.__table__.c.first_name),
+        last_name=bindparam("b_last_name"),
+    )
+)
+_BOOK_COUNTER_STMT = (
+    update(Book.__table__)
+    .where(Book.__table__.c.id == bindparam("b_book_id"))
+    .values(download_count=Book.__table__.c.download_count + bindparam("b_count"))
+)
+
+
+class DownloadRecorder:
+    """下载记录批量写入器"""
+
+    def __init__(self) -> None:
+        self._queue: asyncio.Queue[DownloadEvent] = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+        # 已出队但尚未开始写入的事件，停止时一并写入
+        self._pending: list[DownloadEvent] = []
+        self._flushing: Optional[asyncio.Future] = None
+
+    def record(self, event: DownloadEvent) -> None:
+        """登记一次下载 (不等待写库)，首次调用时启动后台写入任务"""
+        self._queue.put_nowait(event)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        """停止后台任务并写入队列中剩余的事件"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._flushing is not None:
+            await self._flushing
+            self._flushing = None
+        batch = self._pending + self._drain(FLUSH_BATCH_SIZE)
+        self._pending = []
+        while batch:
+            await self._flush_safely(batch)
+            batch = self._drain(FLUSH_BATCH_SIZE)
+
+    def _drain(self, limit: int) -> list[DownloadEvent]:
+        batch: list[DownloadEvent] = []
+        while len(batch) < limit and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        return batch
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            self._pending = [await self._queue.get()]
+            deadline = loop.time() + FLUSH_INTERVAL
+            while len(self._pending) < FLUSH_BATCH_SIZE:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    self._pending.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            batch, self._pending = self._pending, []
+            # 写库过程不随后台任务一起取消，close() 会等待其完成
+            self._flushing = asyncio.ensure_future(self._flush_safely(batch))
+            await asyncio.shield(self._flushing)
+            self._flushing = None
+
+    async def _flush_safely(self, batch: list[DownloadEvent]) -> None:
+        try:
+            await self.flush(batch)
+        except Exception as e:
+            logger.warning(f"批量写入下载记录失败 ({len(batch)} 条): {e}")
+
+    async def flush(self, batch: list[DownloadEvent]) -> None:
+        """写入一批下载记录；整批失败时逐条重试，只丢弃自身写入失败的事件"""
+        if not batch:
+            return
+        try:
+            await self._write(batch)
+        except Exception as e:
+            if len(batch) == 1:
+                raise
+            logger.warning(f"批量写入下载记录失败，改为逐条写入 ({len(batch)} 条): {e}")
+            for event in batch:
+                try:
+                    await self._write([event])
+                except Exception as e:
+                    logger.warning(
+                        f"写入下载记录失败 (用户 {event.user_id}, 书籍 {event.book_id}): {e}"
+                    )
+
+    async def _write(self, batch: list[DownloadEvent]) -> None:
+        """一个事务内写入整批下载记录并累加用户/书籍计数"""
+        # 同一用户取最后一次事件的资料
+        latest_by_user = {event.user_id: event for event in batch}
+        user_counts = Counter(event.user_id for event in batch)
+        book_counts = Counter(event.book_id for event in batch)
+
+        session_factory = get_session_factory()
+        async with session_factory() as session:
+            # 新用户补建记录；与 /start 等并发插入同一用户时不冲突
+            await session.execute(
+                pg_insert(User)
+                .values(
+                    [
+                        {
+                            "id": user_id,
+                            "username": event.username,
+                            "first_name": event.first_name or "Unknown",
+                            "last_name": event.last_name,
+                            "coins": 0,
+                            "upload_count": 0,
+                            "download_count": 0,
+                            "search_count": 0,
+                        }
+                        for user_id, event in latest_by_user.items()
+                    ]
+                )
+                .on_conflict_do_nothing(index_elements=[User.id])
+            )
+
+            conn = await session.connection()
+            await conn.execute(
+                _USER_COUNTER_STMT,
+                [
+                    {
+                        "b_user_id": user_id,
+                        "b_count": user_counts[user_id],
+                        "b_username": event.username,
+                        "b_first_name": event.first_name,
+                        "b_last_name": event.last_name,
+                    }
+                    for user_id, event in latest_by_user.items()
+                ],
+            )
+            await conn.execute(
+                _BOOK_COUNTER_STMT,
+                [{"b_book_id": book_id, "b_count": count} for book_id, count in book_counts.items()],
+            )
+            await session.execute(
+                insert(DownloadLog),
+                [
+                    {
+                        "user_id": event.user_id,
+                        "book_id": event.book_id,
+                        "file_hash": event.file_hash,
+                        "cost_coins": 0,
+                        "is_free": True,
+                    }
+                    for event in batch
+                ],
+            )
+            await session.commit()
+
+
+_recorder: Optional[DownloadRecorder] = None
+
+
+def get_download_recorder() -> DownloadRecorder:
+    global _recorder
+    if _recorder is None:
+        _recorder = DownloadRecorder()
+    return _recorder
+
+
+async def close_download_recorder() -> None:
+    global _recorder
+    if _recorder is None:
+        return
+    await _recorder.close()
+    _recorder = None
@@ -399,6 +399,8 @@ async def get_search_service() -> SearchService:
     """获取搜索服务单例"""
     global _search_service
     if _search_service is None:
-        _search_service = SearchService()
-        await _search_service.ensure_ready()
+        service = SearchService()
+        # 索引就绪后才缓存，初始化失败时下次调用会重新尝试
+        await service.ensure_ready()
+        _search_service = service
     return _search_service
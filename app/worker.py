@@ -12,8 +12,10 @@ from typing import Any, Dict
 
 from arq import create_pool
 from arq.connections import RedisSettings
+from arq.worker import run_worker
 from sqlalchemy import select
 
+from app.core.eventloop import install_event_loop
 from app.core.logger import logger
 from app.core.database import get_session_factory
 from app.core.models import Book, File, User, FileRef, BookStatus, FileFormat, Tag, BookTag
@@ -91,7 +93,7 @@ async def process_file_upload(
 
         session_factory = get_session_factory()
         async with session_factory() as session:
-            db_user = await session.scalar(select(User).where(User.id == user_id))
+            db_user = await session.get(User, user_id)
             if not db_user:
                 db_user = User(
                     id=user_id,
@@ -322,3 +324,9 @@ async def init_task_queue():
 
 async def close_task_queue():
     await task_queue.disconnect()
+
+
+if __name__ == "__main__":
+    # arq 命令行入口无法在建循环前切换策略，因此由本模块启动 Worker
+    install_event_loop()
+    run_worker(WorkerSettings)
@@ -199,7 +199,7 @@ Type=simple
 User=root
 WorkingDirectory=${PROJECT_DIR}
 Environment=PATH=${PROJECT_DIR}/.venv/bin
-ExecStart=${PROJECT_DIR}/.venv/bin/arq app.worker.WorkerSettings
+ExecStart=${PROJECT_DIR}/.venv/bin/python -m app.worker
 Restart=always
 RestartSec=10
 StandardOutput=append:${PROJECT_DIR}/logs/worker.log
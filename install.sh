@@ -743,7 +743,7 @@ Environment=PATH=$PROJECT_DIR/.venv/bin
 Environment=PYTHONUNBUFFERED=1
 Environment=PYTHONFAULTHANDLER=1
 ExecStartPre=/bin/bash -lc 'cd $PROJECT_DIR && echo "VERSION \$(git rev-parse --short HEAD 2>/dev/null) \$(git show -s --format=%ci 2>/dev/null)"'
-ExecStart=$PROJECT_DIR/.venv/bin/arq app.worker.WorkerSettings
+ExecStart=$PROJECT_DIR/.venv/bin/python -m app.worker
 Restart=always
 RestartSec=10
 StandardOutput=journal
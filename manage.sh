@@ -245,7 +245,7 @@ cmd_start_worker() {
     check_services || exit 1
 
     log_info "Worker 正在启动... (按 Ctrl+C 停止)"
-    cd "$PROJECT_DIR" && exec "$VENV_DIR/bin/arq" app.worker.WorkerSettings
+    cd "$PROJECT_DIR" && exec "$VENV_DIR/bin/python" -m app.worker
 }
 
 cmd_gen_service() {
@@ -283,7 +283,7 @@ User=$USER
 WorkingDirectory=$PROJECT_DIR
 Environment=PATH=$VENV_DIR/bin:/usr/local/bin:/usr/bin
 EnvironmentFile=$PROJECT_DIR/.env
-ExecStart=$VENV_DIR/bin/arq app.worker.WorkerSettings
+ExecStart=$VENV_DIR/bin/python -m app.worker
 Restart=always
 RestartSec=10
 
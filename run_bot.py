@@ -12,8 +12,9 @@ project_root = Path(__file__).parent
 sys.path.insert(0, str(project_root))
 
 # 导入并运行主程序
-from app.bot import main
+from app.bot import install_event_loop, main
 import asyncio
 
 if __name__ == "__main__":
+    install_event_loop()
     asyncio.run(main())
@@ -1,6 +1,17 @@
 from types import SimpleNamespace
 
-from app.handlers.book_detail import build_booklist_keyboard, build_user_book_keyboard
+from app.handlers.book_detail import (
+    _BOOK_ACTIONS,
+    build_admin_edit_keyboard,
+    build_admin_tag_queue_keyboard,
+    build_booklist_keyboard,
+    build_booklist_overview_keyboard,
+    build_more_keyboard,
+    build_review_list_keyboard,
+    build_review_rating_keyboard,
+    build_single_booklist_manage_keyboard,
+    build_user_book_keyboard,
+)
 
 
 def _flatten_callback_data(keyboard):
@@ -44,3 +55,26 @@ def test_build_booklist_keyboard_unselected():
     assert "book:booklist_new:9" in all_cb
     assert "book:booklist_overview:9" in all_cb
     assert "book:booklist_toggle:9:5" in all_cb
+
+
+def test_every_book_callback_has_a_handler():
+    booklists = [SimpleNamespace(id=5, name="稍后阅读", is_default=False, is_public=False, items=[])]
+    keyboards = [
+        build_user_book_keyboard(book_id=1, is_fav=False, is_admin=True),
+        build_more_keyboard(book_id=1, is_admin=True),
+        build_booklist_keyboard(book_id=1, booklists=booklists, selected_ids=set()),
+        build_booklist_overview_keyboard(book_id=1, booklists=booklists),
+        build_single_booklist_manage_keyboard(book_id=1, list_id=5, is_default=False),
+        build_review_rating_keyboard(book_id=1),
+        build_review_list_keyboard(book_id=1, page=2, total=20),
+        build_admin_tag_queue_keyboard(
+            book_id=1,
+            items=[SimpleNamespace(id=3, tag_name="仙侠")],
+            current_tags=[(4, "武侠")],
+        ),
+        build_admin_edit_keyboard(book_id=1),
+    ]
+    for kb in keyboards:
+        for data in _flatten_callback_data(kb):
+            if data.startswith("book:"):
+                assert data.split(":")[1] in _BOOK_ACTIONS, data
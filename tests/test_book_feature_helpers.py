@@ -1,8 +1,18 @@
+import asyncio
+from types import SimpleNamespace
+
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.methods import SendDocument
+
+from app.handlers import book_detail
 from app.handlers.book_detail import (
     build_admin_tag_queue_keyboard,
     build_more_keyboard,
     build_review_list_keyboard,
     build_review_rating_keyboard,
+    is_file_id_error,
+    pick_file_refs,
+    truncate_escaped,
 )
 from app.services.book_ops import generate_booklist_share_token
 
@@ -49,3 +59,57 @@ def test_build_admin_tag_queue_keyboard_supports_pending_and_remove():
     assert "book:admin_tag_remove:8:6" in callbacks
     assert "book:admin_tag_approve:8:3" in callbacks
     assert "book:admin_tag_reject:8:3" in callbacks
+
+
+def _ref(**kwargs):
+    fields = dict(is_active=True, is_primary=False, is_backup=False, tg_file_id=None, channel_id=None, message_id=None)
+    fields.update(kwargs)
+    return SimpleNamespace(**fields)
+
+
+def test_pick_file_refs_prefers_flagged_refs_in_single_pass():
+    plain = _ref(tg_file_id="plain", channel_id=-1, message_id=1)
+    primary = _ref(tg_file_id="primary", is_primary=True)
+    backup = _ref(channel_id=-2, message_id=2, is_backup=True)
+    inactive = _ref(tg_file_id="dead", is_primary=True, is_backup=True, channel_id=-3, message_id=3, is_active=False)
+    assert pick_file_refs([inactive, plain, primary, backup]) == (primary, backup)
+    assert pick_file_refs([inactive, plain]) == (plain, plain)
+    assert pick_file_refs([]) == (None, None)
+
+
+def test_truncate_escaped_never_splits_entities():
+    assert truncate_escaped("abc", 10) == "abc"
+    assert truncate_escaped("a&amp;b&lt;c", 9) == "a&amp;..."
+    assert truncate_escaped("abcdefgh&lt;", 11) == "abcdefgh..."
+    assert truncate_escaped("abcdef", 2) == ""
+
+
+def test_get_book_card_coalesces_concurrent_misses(monkeypatch):
+    calls = []
+
+    async def fake_load(book_id):
+        calls.append(book_id)
+        await asyncio.sleep(0.01)
+        return None
+
+    monkeypatch.setattr(book_detail, "get_book_from_db", fake_load)
+
+    async def run():
+        return await asyncio.gather(*(book_detail.get_book_card(7) for _ in range(10)))
+
+    assert asyncio.run(run()) == [None] * 10
+    assert calls == [7]
+    assert not book_detail._CARD_INFLIGHT
+
+
+def test_is_file_id_error_ignores_chat_and_caption_errors():
+    method = SendDocument(chat_id=1, document="X")
+
+    def error(text):
+        return TelegramBadRequest(method=method, message=text)
+
+    assert is_file_id_error(error("Bad Request: wrong file identifier/HTTP URL specified"))
+    assert is_file_id_error(error("Bad Request: FILE_REFERENCE_EXPIRED"))
+    assert not is_file_id_error(error("Bad Request: chat not found"))
+    assert not is_file_id_error(error("Bad Request: can't parse entities: unexpected end tag"))
+    assert not is_file_id_error(error("Bad Request: BUTTON_DATA_INVALID"))
@@ -0,0 +1,32 @@
+import asyncio
+
+from app.services.downloads import DownloadEvent, DownloadRecorder
+
+
+def _event(user_id, book_id):
+    return DownloadEvent(
+        user_id=user_id,
+        username=None,
+        first_name="A",
+        last_name=None,
+        book_id=book_id,
+        file_hash="h",
+    )
+
+
+def test_flush_retries_failed_batch_event_by_event(monkeypatch):
+    written = []
+
+    async def fake_write(batch):
+        # 整批失败 (其中一本书已被删除)，逐条重试时只有该事件失败
+        if len(batch) > 1 or batch[0].book_id == 2:
+            raise RuntimeError("foreign key violation")
+        written.extend(batch)
+
+    recorder = DownloadRecorder()
+    monkeypatch.setattr(recorder, "_write", fake_write)
+
+    batch = [_event(1, 1), _event(1, 2), _event(2, 3)]
+    asyncio.run(recorder.flush(batch))
+
+    assert [(e.user_id, e.book_id) for e in written] == [(1, 1), (2, 3)]
@@ -1,5 +1,8 @@
 # -*- coding: utf-8 -*-
 
+import asyncio
+
+from app.handlers import common
 from app.handlers.common import HELP_TEXT, HELP_KEYBOARD
 
 
@@ -18,3 +21,22 @@ def test_help_keyboard_buttons():
     assert HELP_KEYBOARD.inline_keyboard[0][0].text == "邀请书友使用"
     assert HELP_KEYBOARD.inline_keyboard[0][1].text == "捐赠会员计划"
 
+
+
+def test_info_text_is_cached_and_refreshed_once(monkeypatch):
+    calls = []
+
+    async def fake_build():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "书库统计"
+
+    monkeypatch.setattr(common, "build_info_text", fake_build)
+    monkeypatch.setattr(common, "INFO_CACHE", common.TTLCache(maxsize=1, ttl=120))
+
+    async def run():
+        return await asyncio.gather(*(common.get_info_text() for _ in range(5)))
+
+    assert asyncio.run(run()) == ["书库统计"] * 5
+    assert asyncio.run(common.get_info_text()) == "书库统计"
+    assert len(calls) == 1
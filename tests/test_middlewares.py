@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+from types import SimpleNamespace
+
+from app.core.middlewares import PerChatConcurrencyMiddleware
+
+
+def test_per_chat_middleware_serializes_same_chat_and_releases_locks():
+    middleware = PerChatConcurrencyMiddleware()
+    order: list[str] = []
+
+    async def handler(event, data):
+        order.append(f"start:{event}")
+        await asyncio.sleep(0.01 if event == "a1" else 0)
+        order.append(f"end:{event}")
+
+    async def run():
+        chat_a = {"event_chat": SimpleNamespace(id=1)}
+        chat_b = {"event_chat": SimpleNamespace(id=2)}
+        await asyncio.gather(
+            middleware(handler, "a1", chat_a),
+            middleware(handler, "a2", chat_a),
+            middleware(handler, "b1", chat_b),
+        )
+
+    asyncio.run(run())
+
+    # 同一会话按顺序执行，其他会话不被阻塞
+    assert order.index("end:a1") < order.index("start:a2")
+    assert order.index("end:b1") < order.index("end:a1")
+    assert middleware._locks == {}
+    assert middleware._waiters == {}
+
+
+def test_per_chat_middleware_passes_through_without_chat():
+    middleware = PerChatConcurrencyMiddleware()
+
+    async def handler(event, data):
+        return event
+
+    assert asyncio.run(middleware(handler, "x", {})) == "x"
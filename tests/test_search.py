@@ -52,6 +52,10 @@ class TestFormatHelpers:
         """测试亿字格式化"""
         assert format_word_count(100000000) == "1.0亿"
         assert format_word_count(150000000) == "1.5亿"
+        # 进位边界与 f"{x:.1f}" 一致
+        assert format_word_count(115000000) == "1.1亿"
+        assert format_word_count(125000000) == "1.2亿"
+        assert format_word_count(135000000) == "1.4亿"
 
     def test_get_rating_stars(self):
         """测试评分星星显示"""